@@ -68,6 +68,7 @@ setup(
     # $ pip install -e .[dev,test]
     extras_require = {
       'dev': ['bump2version'],
+      'speedups': ['orjson'],  # faster json (de)serialisation
     # 'test': ['coverage'],
     },
     # If there are data files included in your packages that need to be
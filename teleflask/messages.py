@@ -586,13 +586,13 @@ def ImageMessage(file_path=None, file_url=None, file_content=None, caption=None,
         file = requests.get(file_url)
         file_content = file.content
         mime = magic.from_buffer(file_content, mime=True)
-        logger.debug("Got mime type of url {url!r}: {mime}".format(url=file_url, mime=mime))
+        logger.debug("Got mime type of url %r: %s", file_url, mime)
     elif file_path:
         mime = get_file_mime(file_path)
-        logger.debug("Got mime type of file {path!r}: {mime}".format(path=file_path, mime=mime))
+        logger.debug("Got mime type of file %r: %s", file_path, mime)
     elif file_content:
          mime = magic.from_buffer(file_content, True)
-         logger.debug("Got mime type of the blob: {mime}".format(mime=mime))
+         logger.debug("Got mime type of the blob: %s", mime)
     else:
         raise ValueError("Neither file_path, file_url nor file_content were given.")
     # end if
@@ -748,17 +748,18 @@ class TextMessage(Message):
         texts = text_split(text, MAX_TEXT_LENGTH, max_parts=2)
         if len(texts) == 0:
             raise ValueError("Text was empty")
-        if len(texts) == 1:
-            logger.debug("Message has length {all} ({all_bytes} bytes). Not split.".format(
-                all=len(text), all_bytes=len(escape(text).encode("utf-8"))
-            ))
-        else:
-            logger.debug(
-                "Message of length {all} ({all_bytes} bytes) split into {part} ({part_bytes} bytes) + {rest} more.".format(
-                    all=len(text), all_bytes=len(escape(text).encode("utf-8")),
-                    part=len(texts[0]), part_bytes=len(escape(texts[0]).encode("utf-8")), rest=len(texts) - 1
+        if logger.isEnabledFor(logging.DEBUG):  # escaping and encoding the text is only needed to log its size.
+            if len(texts) == 1:
+                logger.debug(
+                    "Message has length %d (%d bytes). Not split.", len(text), len(escape(text).encode("utf-8"))
                 )
-            )
+            else:
+                logger.debug(
+                    "Message of length %d (%d bytes) split into %d (%d bytes) + %d more.",
+                    len(text), len(escape(text).encode("utf-8")),
+                    len(texts[0]), len(escape(texts[0]).encode("utf-8")), len(texts) - 1
+                )
+            # end if
         # end if
         self.disable_web_page_preview = disable_web_page_preview
         self.parse_mode = parse_mode
@@ -1,20 +1,22 @@
 # -*- coding: utf-8 -*-
 
 import requests
-from pytgbot import Bot
 from pytgbot.api_types.receivable import WebhookInfo
 from luckydonaldUtils.logger import logging
 
+from .server.pooling import PooledBot, create_session, POLLING_POOL_SIZE
+
 __author__ = 'luckydonald'
 logger = logging.getLogger(__name__)
 
 
 def proxy_telegram(api_key, https=False, host="localhost", hookpath="/income/{API_KEY}", full_url=None):
-    logger.debug("https: {!r}, host: {!r}, hookpath: {!r}, full_url: {!r}".format(https, host, hookpath, full_url))
+    logger.debug("https: %r, host: %r, hookpath: %r, full_url: %r", https, host, hookpath, full_url)
     if full_url is None:
         full_url = "http" + ("s" if https else "") + "://" + host + hookpath.format(API_KEY=api_key)
     # end if
-    bot = Bot(api_key, return_python_objects=False)
+    # own small connection pool, so the long polling doesn't compete with the app sending messages.
+    bot = PooledBot(api_key, return_python_objects=False, session=create_session(pool_size=POLLING_POOL_SIZE))
     if bot.get_webhook_info()["result"]["url"] == "":
         logger.info("Webhook unset correctly. No need to change.")
     else:
@@ -27,9 +29,7 @@ def proxy_telegram(api_key, https=False, host="localhost", hookpath="/income/{AP
         n = len(updates)
         for i, update in  enumerate(updates):
             last_update = update['update_id'] + 1
-            logger.debug("Polling update ({i:03}/{n:03}|{l}):\n{u}\n{r!r}".format(
-                r=update, i=i, n=n, l=last_update, u=full_url
-            ))
+            logger.debug("Polling update (%03d/%03d|%s):\n%s\n%r", i, n, last_update, full_url, update)
             requests.post(
                 full_url,
                 json=update,
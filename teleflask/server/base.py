@@ -1,20 +1,152 @@
 # -*- coding: utf-8 -*-
+import os
 import abc
-
-from pytgbot import Bot
+import hmac
+import json
+import hashlib
+import time
+import queue
+import socket
+import requests
+import threading
+from pprint import pformat
+from types import MappingProxyType, GeneratorType
+from functools import wraps
+from operator import attrgetter
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Response, request, session
 from pytgbot.api_types import TgBotApiObject
-from pytgbot.exceptions import TgApiServerException
+from pytgbot.exceptions import TgApiServerException, TgApiException
+from pytgbot.api_types.receivable import WebhookInfo
 from pytgbot.api_types.receivable.updates import Update as TGUpdate
+from requests.exceptions import RequestException
 from luckydonaldUtils.logger import logging
 from luckydonaldUtils.exceptions import assert_type_or_raise
 
 from .. import VERSION
-from .utilities import _class_self_decorate
+from ..messages import Message, TextMessage
+from ..new_messages import SendableMessageBase
+from .pooling import PooledBot, create_session, create_http_session, DEFAULT_POOL_SIZE
+from .ratelimit import RateLimiter, get_retry_after, get_result_retry_after
+from .breaker import get_retry_guard
+from .utilities import _class_self_decorate, redact_api_key_in_logs
 
 __author__ = 'luckydonald'
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson  # optional, a lot faster (de)serialisation of json.
+except ImportError:
+    orjson = None
+# end try
+
+Bot = PooledBot  # the bot class init_bot() creates. Replaceable, e.g. with a mocking bot class in unit tests.
 _self_jsonify = _class_self_decorate("jsonify")  # calls self.jsonify(...) with the result of the decorated function.
+_json_loads = orjson.loads if orjson else json.loads  # both accept bytes
+
+
+def _json_dumps(obj):
+    """
+    Serializes `obj` to json, using orjson if available.
+
+    :return: the json as utf-8 encoded bytes.
+    :rtype: bytes
+    """
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)  # allow int keys like json.dumps(...) does.
+    # end if
+    return json.dumps(obj).encode("utf-8")
+# end def
+
+
+IPINFO_URL = 'http://ipinfo.io'
+IPINFO_CACHE_SECONDS = 5 * 60  # our public ip doesn't change that often.
+IPINFO_CACHE_DISABLED = bool(os.getenv("TELEFLASK_DISABLE_IPINFO_CACHE"))  # e.g. if the ip changes a lot.
+_ipinfo_cache = (0.0, None)  # (time.monotonic() of fetching, the parsed ipinfo json)
+_hostname = socket.gethostname()
+
+# Optional file to remember the webhook we've set, so a restart doesn't need to ask telegram again. Unset to disable.
+WEBHOOK_STATE_PATH = os.getenv("TELEFLASK_WEBHOOK_STATE")
+
+_MESSAGE_TYPES = (Message, SendableMessageBase)  # everything `send_messages` can send directly.
+_known_message_types = set()  # exact classes already found to be one of those, so isinstance isn't needed again.
+_RULE_FIELDS = ('methods', 'rule', 'endpoint', 'subdomain', 'redirect_to', 'alias', 'host', 'build_only')
+_get_rule_fields = attrgetter(*_RULE_FIELDS)  # werkzeug.routing.Rule -> tuple of the values, as listed above
+_consume = deque(maxlen=0).extend  # runs a generator to the end, without keeping any of the results.
+_STOP_PROCESSING = object()  # queued by stop_background_processing(), to end the background thread.
+_REPLY_MESSAGE_GETTERS = tuple(  # in order of preference.
+    attrgetter(field) for field in ('message', 'channel_post', 'edited_message', 'edited_channel_post')
+)
+
+
+def _iter_messages(messages):
+    """
+    Iterates over the messages given to `send_messages`, be it a single one or a list, tuple or generator of them.
+    Other iterables (like a dict, a set or the characters of a str) are refused.
+    Doesn't check the single messages, that's done by `send_messages` itself.
+
+    :param messages: A single message (or str), or a list, tuple or generator of those.
+    :type  messages: Message | SendableMessageBase | str | list | tuple | types.GeneratorType
+
+    :raises TypeError: If it is neither a message, nor a list, tuple or generator.
+    """
+    message_type = type(messages)  # exact type checks first, as those are way cheaper than isinstance.
+    if message_type is list or message_type is tuple or message_type is GeneratorType:
+        return iter(messages)
+    # end if
+    if message_type is str or isinstance(messages, (str, Message, SendableMessageBase)):
+        return iter((messages,))
+    # end if
+    if isinstance(messages, (list, tuple, GeneratorType)):
+        return iter(messages)
+    # end if
+    raise TypeError("Is not a Message type (or str or a list/tuple/generator of those).")
+# end def
+
+
+def _cacheable(func):
+    """
+    Decorator for views returning a :class:`flask.Response`.
+    Allows clients (and proxies) to cache successful responses for `self.DEBUG_ROUTES_CACHE_SECONDS` seconds,
+    by setting the `Cache-Control` header.
+    """
+    @wraps(func)
+    def cacheable_inner(self, *args, **kwargs):
+        response = func(self, *args, **kwargs)
+        seconds = self.DEBUG_ROUTES_CACHE_SECONDS
+        if seconds and response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=%d" % seconds
+        # end if
+        return response
+    # end def
+    return cacheable_inner
+# end def
+
+
+def _get_ipinfo(session=requests):
+    """
+    Returns the information ipinfo.io has about our (public) ip,
+    reusing the last response for `IPINFO_CACHE_SECONDS` seconds, for all instances in this process.
+    Set the `TELEFLASK_DISABLE_IPINFO_CACHE` environment variable to always do a new request.
+
+    :param session: The session to do the request with, so an already open connection can be reused.
+                    Defaults to the `requests` module itself, opening a new connection.
+    :type  session: requests.Session
+
+    :return: the parsed json, like `{"ip": "1.2.3.4", ...}`. Don't modify it, make a copy.
+    :rtype: dict
+    """
+    global _ipinfo_cache
+    fetched_at, info = _ipinfo_cache
+    now = time.monotonic()
+    if info is None or IPINFO_CACHE_DISABLED or now - fetched_at > IPINFO_CACHE_SECONDS:
+        info = session.get(IPINFO_URL, timeout=5).json()
+        _ipinfo_cache = (now, info)
+    # end if
+    return info
+# end def
 
 
 class TeleflaskMixinBase(metaclass=abc.ABCMeta):
@@ -52,12 +184,34 @@ class TeleflaskBase(TeleflaskMixinBase):
     VERSION = VERSION
     __version__ = VERSION
 
+    # Read-only empty defaults, so instances don't need their own empty containers.
+    # Mixins actually using them (e.g. `BotCommandsMixin`) set their own on the instance.
+    update_listener = ()
+    commands = MappingProxyType({})
+
+    WEBHOOK_INFO_CACHE_SECONDS = 30  # how long `view_status` reuses the last fetched webhook info.
+    GET_ME_TIMEOUT = 30  # how long `username` and `user_id` wait for the `get_me` call started by `init_bot()`.
+    WEBHOOK_STATE_MAX_AGE = 24 * 60 * 60  # how long we trust the webhook remembered in `WEBHOOK_STATE_PATH`.
+    DEBUG_ROUTES_CACHE_SECONDS = 60  # `max-age` clients may cache `view_status` and `view_host_info`. 0 to disable.
+
+    # The attributes accessed on every request get slots, so they don't need a `__dict__` lookup.
+    # As `TeleflaskMixinBase` has no `__slots__`, instances (and mixins) still have a `__dict__` for everything else.
+    __slots__ = (
+        '__api_key', '__api_key_bytes', '__webhook_url', '_bot', '_return_python_objects', '_user_id', '_username',
+        'app', 'blueprint', 'hostname', 'hostpath', 'hookpath',
+        'disable_setting_webhook_route', 'disable_setting_webhook_telegram',
+        '_connection_pool_size', '_send_workers', '_send_pool', '_webhook_info_cache', '_update_queue', '_update_thread', '_http',
+        '_me_thread', '_me_error', '_pending_routes', '_debug_exec_path', '_routes_info_cache',
+        '_send_limiter', '_send_retries',
+    )
+
     def __init__(self, api_key, app=None, blueprint=None,
                  # FlaskTgBot kwargs:
                  hostname=None, hostpath=None, hookpath="/income/{API_KEY}",
                  debug_routes=False, disable_setting_webhook_route=None, disable_setting_webhook_telegram=None,
                  # pytgbot kwargs:
-                 return_python_objects=True):
+                 return_python_objects=True, connection_pool_size=DEFAULT_POOL_SIZE, send_workers=1,
+                 process_in_background=False, send_rate_limit=None, send_retries=0):
         """
         A new Teleflask(Base) object.
 
@@ -103,77 +257,166 @@ class TeleflaskBase(TeleflaskMixinBase):
         :type  disable_setting_webhook_route: None|bool
 
         :param return_python_objects: Enable return_python_objects in pytgbot. See pytgbot.bot.Bot
+
+        :param connection_pool_size: How many connections to the Telegram API are kept open for reuse.
+        :type  connection_pool_size: int
+
+        :param send_workers: How many messages of a single result are sent to telegram at the same time.
+                             Defaults to 1, sending them one after another.
+                             Note: With more than 1 the order the messages arrive in the chat is not guaranteed any longer.
+        :type  send_workers: int
+
+        :param process_in_background: Answer telegram's webhook request right away, and process the update afterwards
+                                      in a background thread. Any result is then sent via the bot api,
+                                      instead of being part of the webhook response.
+                                      The thread is started by :meth:`init_app`, and ended by :meth:`stop_background_processing`.
+                                      Note: As telegram already got its answer, updates still queued when the process
+                                      exits (or crashes) are lost. Telegram won't send them again.
+        :type  process_in_background: bool
+
+        :param send_rate_limit: How many messages are sent per second at most, e.g. `30` for telegram's global limit.
+                                If telegram still answers with `429 Too Many Requests`, all sending
+                                is paused for the `retry_after` seconds given by telegram.
+                                Counted per message, even if sending it needs several api calls
+                                (e.g. a chat action before it, or a text split into multiple parts).
+                                Defaults to `None`, not limiting at all.
+        :type  send_rate_limit: None | int
+
+        :param send_retries: How often a single request to telegram is sent again, if it failed with a temporary error
+                             (`429 Too Many Requests`, `5xx` or no connection), waiting a bit longer every time.
+                             Retries stop while most of the requests fail anyway.
+                             Defaults to 0, never retrying.
+        :type  send_retries: int
         """
         self.__api_key = api_key
+        self.__api_key_bytes = api_key.encode("utf-8") if api_key else None  # to replace it in serialized json.
+        self._debug_exec_path = f"/teleflask_debug/exec/{api_key}/<command>"  # see self.setup_routes(...)
         self._bot = None  # will be set in self.init_bot()
+        self._user_id = None  # will be set in the background, started by self.init_bot()
+        self._username = None  # will be set in the background, started by self.init_bot()
+        self._me_thread = None  # the thread doing that, see self._wait_for_me()
+        self._me_error = None  # the exception raised doing that, if any.
         self.app = None  # will be filled out by self.init_app(...)
         self.blueprint = None  # will be filled out by self.init_app(...)
+        self._pending_routes = []  # calls of self.setup_routes(...) before there was an app, done by self.init_app(...)
         self._return_python_objects = return_python_objects
+        self._connection_pool_size = connection_pool_size
+        self._send_workers = send_workers
+        self._send_pool = None  # will be created by self._get_send_pool() when first needed.
+        self._send_limiter = RateLimiter(send_rate_limit) if send_rate_limit else None
+        self._send_retries = send_retries  # passed to the bot by self.init_bot()
         self.__webhook_url = None  # will be filled out by self.calculate_webhook_url() in self.init_app(...)
+        self._webhook_info_cache = (0.0, None)  # (time.monotonic() of fetching, result of bot.get_webhook_info())
+        self._routes_info_cache = None  # result of self.view_routes_info(), reset by self.setup_routes(...)
+        self._http = None  # will be created by self.http when first needed.
+        self._update_queue = queue.SimpleQueue() if process_in_background else None  # see self.view_updates()
+        self._update_thread = None  # processing that queue, started by self.init_app(...)
         self.hostname = hostname  # e.g. "example.com:443"
         self.hostpath = hostpath
         self.hookpath = hookpath
 
+        config = getattr(app, 'config', None) or {}  # no app (yet) or no config means both default to False.
         if disable_setting_webhook_route is None:
-            try:
-                self.disable_setting_webhook_route = self.app.config["DISABLE_SETTING_WEBHOOK_ROUTE"]
-            except (AttributeError, KeyError):
-                logger.debug(
-                    'disable_setting_webhook_route is None and app is None or app has no DISABLE_SETTING_WEBHOOK_ROUTE'
-                    ' config. Assuming False.'
-                )
-                self.disable_setting_webhook_route = False
-            # end try
-        else:
-            self.disable_setting_webhook_route = disable_setting_webhook_route
+            disable_setting_webhook_route = config.get("DISABLE_SETTING_WEBHOOK_ROUTE", False)
         # end if
+        self.disable_setting_webhook_route = disable_setting_webhook_route
 
         if disable_setting_webhook_telegram is None:
-            try:
-                self.disable_setting_webhook_telegram = self.app.config["DISABLE_SETTING_WEBHOOK_TELEGRAM"]
-            except (AttributeError, KeyError):
-                logger.debug(
-                    'disable_setting_webhook_telegram is None and app is None or app has no DISABLE_SETTING_WEBHOOK_TELEGRAM'
-                    ' config. Assuming False.'
-                )
-                self.disable_setting_webhook_telegram = False
-            # end try
-        else:
-            self.disable_setting_webhook_telegram = disable_setting_webhook_telegram
+            disable_setting_webhook_telegram = config.get("DISABLE_SETTING_WEBHOOK_TELEGRAM", False)
         # end if
+        self.disable_setting_webhook_telegram = disable_setting_webhook_telegram
 
         if app or blueprint:  # if we have an app or flask blueprint call init_app for adding the routes, which calls init_bot as well.
             self.init_app(app, blueprint=blueprint, debug_routes=debug_routes)
         elif api_key:  # otherwise if we have at least an api key, call init_bot.
             self.init_bot()
         # end if
-
-        self.update_listener = list()
-        self.commands = dict()
     # end def
 
     def init_bot(self):
         """
-        Creates the bot, and retrieves information about the bot itself (username, user_id) from telegram.
+        Creates the bot, and starts retrieving information about the bot itself (username, user_id) from telegram in the background.
 
         :return:
         """
+        redact_api_key_in_logs(self.__api_key)  # hide the api key in anything teleflask logs from now on.
         if not self._bot:  # so you can manually set it before calling `init_app(...)`,
             # e.g. a mocking bot class for unit tests
-            self._bot = Bot(self._api_key, return_python_objects=self._return_python_objects)
+            if isinstance(Bot, type) and issubclass(Bot, PooledBot):
+                self._bot = Bot(
+                    self.__api_key, return_python_objects=self._return_python_objects,
+                    session=create_session(pool_size=self._connection_pool_size),
+                    retries=self._send_retries,
+                    retry_guard=get_retry_guard(self.__api_key) if self._send_retries else None,  # shared per bot.
+                )
+            else:  # replaced, e.g. by a mocking bot class in unit tests.
+                self._bot = Bot(self.__api_key, return_python_objects=self._return_python_objects)
+            # end if
         elif self._bot.return_python_objects != self._return_python_objects:
             # we don't have the same setting as the given one
             raise ValueError("The already set bot has return_python_objects {given}, but we have {our}".format(
                 given=self._bot.return_python_objects, our=self._return_python_objects
             ))
         # end def
-        myself = self._bot.get_me()
-        if self._bot.return_python_objects:
-            self._user_id = myself.id
-            self._username = myself.username
-        else:
-            self._user_id = myself["result"]["id"]
-            self._username = myself["result"]["username"]
+        # Asking telegram who we are takes a round trip, so we don't block the startup of the server with it.
+        # Accessing `self.username` or `self.user_id` will wait for it to be done.
+        self._start_fetch_me()
+    # end def
+
+    def _start_fetch_me(self):
+        """
+        Starts retrieving information about the bot itself (username, user_id) in a background thread.
+
+        :rtype: threading.Thread
+        """
+        self._me_error = None
+        thread = threading.Thread(target=self._fetch_me, name="teleflask-get-me", daemon=True)
+        self._me_thread = thread
+        thread.start()
+        return thread
+    # end def
+
+    def _fetch_me(self):
+        """
+        Retrieves information about the bot itself (username, user_id) from telegram.
+        Runs in a background thread started by `init_bot()`.
+        """
+        try:
+            myself = self._bot.get_me()
+            if self._bot.return_python_objects:
+                self._user_id, self._username = myself.id, myself.username
+            else:
+                myself = myself["result"]
+                self._user_id, self._username = myself["id"], myself["username"]
+            # end if
+        except Exception as e:
+            logger.exception("Could not retrieve information about the bot itself (get_me).")
+            self._me_error = e
+        # end try
+    # end def
+
+    def _wait_for_me(self):
+        """
+        Waits for the `get_me` call started by `init_bot()`, if it is still running.
+        If that failed, the exception is re-raised, and the next call asks telegram again.
+
+        :raises TimeoutError: If telegram didn't answer within `GET_ME_TIMEOUT` seconds.
+        """
+        thread = self._me_thread
+        if thread is None:
+            if self._bot is None:  # no init_bot() yet.
+                return
+            # end if
+            thread = self._start_fetch_me()  # the last attempt failed, try again.
+        # end if
+        thread.join(timeout=self.GET_ME_TIMEOUT)
+        if thread.is_alive():
+            raise TimeoutError(f"Telegram didn't answer get_me within {self.GET_ME_TIMEOUT} seconds.")
+        # end if
+        error = self._me_error
+        if error is not None:
+            self._me_thread = self._me_error = None  # don't keep a temporary failure forever.
+            raise error
         # end if
     # end def
 
@@ -202,9 +445,36 @@ class TeleflaskBase(TeleflaskMixinBase):
         self.blueprint = blueprint
         self.init_bot()
         hookpath, self.__webhook_url = self.calculate_webhook_url(hostname=self.hostname, hostpath=self.hostpath, hookpath=self.hookpath)
-        self.setup_routes(hookpath=hookpath, debug_routes=debug_routes)
+        # Replay the setup_routes(...) calls done before there was an app. Their hookpath is only filled in now,
+        # and every hookpath is only added once, so that doesn't register the webhook twice.
+        pending_routes, self._pending_routes = self._pending_routes, []
+        hookpaths = [self._fill_hookpath(pending_hookpath) for pending_hookpath, _ in pending_routes]
+        hookpaths.append(hookpath)
+        debug_routes = debug_routes or any(pending_debug_routes for _, pending_debug_routes in pending_routes)
+        for i, route_hookpath in enumerate(dict.fromkeys(hookpaths)):  # unique, but keeping the order.
+            self.setup_routes(hookpath=route_hookpath, debug_routes=debug_routes and i == 0)
+        # end for
         self.set_webhook_telegram()  # this will set the webhook in the bot api.
         self.do_startup()  # this calls the startup listeners of extending classes.
+        if self._update_queue is not None:
+            if app is not None:
+                self._start_background_processing(app)
+            elif blueprint is not None:  # only a blueprint, so we have to wait for it being registered at an app.
+                blueprint.record_once(lambda state: self._start_background_processing(state.app))
+            # end if
+        # end if
+    # end def
+
+    def _fill_hookpath(self, hookpath):
+        """
+        Replaces the ``{API_KEY}`` placeholder in the hookpath with the actual api key.
+
+        :param hookpath: The hookpath template, e.g. "/income/{API_KEY}"
+        :type  hookpath: str
+
+        :rtype: str
+        """
+        return hookpath.replace("{API_KEY}", self.__api_key)  # the only placeholder, no need for str.format.
     # end def
 
     def calculate_webhook_url(self, hostname=None, hostpath=None, hookpath="/income/{API_KEY}"):
@@ -241,7 +511,6 @@ class TeleflaskBase(TeleflaskMixinBase):
         :return: the tuple of calculated (hookpath, webhook_url).
         :rtype: tuple
         """
-        import os, requests
         # #
         # #  try to fill out empty arguments
         # #
@@ -257,12 +526,10 @@ class TeleflaskBase(TeleflaskMixinBase):
         # #
         # #  check if the path looks at least a bit valid
         # #
-        logger.debug("hostname={hostn!r}, hostpath={hostp!r}, hookpath={hookp!r}".format(
-            hostn=hostname, hostp=hostpath, hookp=hookpath
-        ))
+        logger.debug("hostname=%r, hostpath=%r, hookpath=%r", hostname, hostpath, hookpath)
         if hostname:
             if hostname.endswith("/"):
-                raise ValueError("hostname can't end with a slash: {value}".format(value=hostname))
+                raise ValueError(f"hostname can't end with a slash: {hostname}")
             # end if
             if hostname.startswith("https://"):
                 hostname = hostname[len("https://"):]
@@ -273,27 +540,28 @@ class TeleflaskBase(TeleflaskMixinBase):
                                  "Also telegram doesn't support http, only https.")
             # end if
         else:  # no hostname
-            info = requests.get('http://ipinfo.io').json()
-            hostname = str(info["ip"])
-            logger.warning("URL_HOSTNAME env not set, falling back to ip address: {ip!r}".format(ip=hostname))
+            hostname = str(_get_ipinfo(self.http)["ip"])
+            logger.warning("URL_HOSTNAME env not set, falling back to ip address: %r", hostname)
         # end if
         if not hostpath == "" and not hostpath.startswith("/"):
-            logger.info("hostpath didn't start with a slash: {value!r} Will be added automatically".format(value=hostpath))
+            logger.info("hostpath didn't start with a slash: %r Will be added automatically", hostpath)
             hostpath = "/" + hostpath
         # end def
         if not hookpath.startswith("/"):
-            raise ValueError("hookpath must start with a slash: {value!r}".format(value=hostpath))
+            raise ValueError(f"hookpath must start with a slash: {hookpath!r}")
         # end def
-        hookpath = hookpath.format(API_KEY=self._api_key)
+        hookpath = self._fill_hookpath(hookpath)
         if not hostpath:
             logger.info("URL_PATH is not set.")
-        webhook_url = "https://{hostname}{hostpath}{hookpath}".format(hostname=hostname, hostpath=hostpath, hookpath=hookpath)
-        logger.debug("host={hostn!r}, hostpath={hostp!r}, hookpath={hookp!r}, hookurl={url!r}".format(
-            hostn=hostname, hostp=hostpath, hookp=hookpath, url=webhook_url
-        ))
+        # end if
+        webhook_url = f"https://{hostname}{hostpath}{hookpath}"
+        logger.debug("host=%r, hostpath=%r, hookpath=%r, hookurl=%r", hostname, hostpath, hookpath, webhook_url)
         return hookpath, webhook_url
     # end def
 
+    # Note: The following properties are for public read-only access.
+    # Code inside this class reads the underlying attributes directly, saving the extra function call.
+
     @property
     def bot(self):
         """
@@ -308,11 +576,17 @@ class TeleflaskBase(TeleflaskMixinBase):
         Returns the name of the registerd bot
         :return:
         """
+        if self._user_id is None:  # not known yet, wait for (or retry) the get_me call.
+            self._wait_for_me()
+        # end if
         return self._username
     # end def
 
     @property
     def user_id(self):
+        if self._user_id is None:  # not known yet, wait for (or retry) the get_me call.
+            self._wait_for_me()
+        # end if
         return self._user_id
     # end def
 
@@ -326,6 +600,20 @@ class TeleflaskBase(TeleflaskMixinBase):
         return self.__api_key
     # end def
 
+    @property
+    def http(self):
+        """
+        A pooled session for requests not going to telegram, e.g. looking up our ip at ipinfo.io.
+        Created on first use.
+
+        :rtype: requests.Session
+        """
+        if self._http is None:
+            self._http = create_http_session()
+        # end if
+        return self._http
+    # end def
+
     def set_webhook_telegram(self):
         """
         Sets the telegram webhook.
@@ -333,37 +621,115 @@ class TeleflaskBase(TeleflaskMixinBase):
 
         :return:
         """
-        assert isinstance(self.bot, Bot)
-        existing_webhook = self.bot.get_webhook_info()
+        if self._is_webhook_state_current():
+            logger.info("Webhook set correctly, as remembered in %r. No need to change.", WEBHOOK_STATE_PATH)
+            return
+        # end if
+        existing_webhook = self._bot.get_webhook_info()
+        self._webhook_info_cache = (time.monotonic(), existing_webhook)  # so `view_status` can reuse it.
 
         if self._return_python_objects:
-            from pytgbot.api_types.receivable import WebhookInfo
             assert isinstance(existing_webhook, WebhookInfo)
             webhook_url = existing_webhook.url
-            webhook_meta = existing_webhook.to_array()
         else:
-            webhook_url = existing_webhook["result"]["url"]
-            webhook_meta = existing_webhook["result"]
+            existing_webhook = existing_webhook["result"]
+            webhook_url = existing_webhook["url"]
         # end def
-        del existing_webhook
-        logger.info("Last webhook pointed to {url!r}.\nMetadata: {hook}".format(
-            url=self.hide_api_key(webhook_url), hook=self.hide_api_key("{!r}".format(webhook_meta))
-            ))
-        if webhook_url == self._webhook_url:
+        if webhook_url == self.__webhook_url:
             logger.info("Webhook set correctly. No need to change.")
+            self._remember_webhook_state()
         else:
+            logger.info("Last webhook pointed to %r.", webhook_url)
+            if logger.isEnabledFor(logging.DEBUG):
+                # converting the whole metadata is only worth it if it's logged at all.
+                webhook_meta = existing_webhook.to_array() if self._return_python_objects else existing_webhook
+                logger.debug("Metadata: %s", webhook_meta)
+            # end if
             if not self.disable_setting_webhook_telegram:
-                logger.info("Setting webhook to {url}".format(url=self.hide_api_key(self._webhook_url)))
-                logger.debug(self.bot.set_webhook(url=self._webhook_url))
+                logger.info("Setting webhook to %s", self.__webhook_url)
+                result = self._bot.set_webhook(url=self.__webhook_url)
+                logger.debug("set_webhook: %r", result)
+                self._webhook_info_cache = (0.0, None)  # changed, so don't use the old one any longer
+                self._remember_webhook_state()
             else:
                 logger.info(
-                    "Would set webhook to {url!r}, but action is disabled by DISABLE_SETTING_TELEGRAM_WEBHOOK config "
-                    "or disable_setting_webhook_telegram argument.".format(url=self.hide_api_key(self._webhook_url))
+                    "Would set webhook to %r, but action is disabled by DISABLE_SETTING_WEBHOOK_TELEGRAM config "
+                    "or disable_setting_webhook_telegram argument.", self.__webhook_url
                 )
             # end if
         # end if
     # end def
 
+    def _webhook_state_hash(self):
+        """
+        The hash of the webhook url stored in the `WEBHOOK_STATE_PATH` file, so the api key it contains isn't written to disk.
+
+        :rtype: str
+        """
+        return hashlib.sha256(self.__webhook_url.encode("utf-8")).hexdigest()
+    # end def
+
+    def _is_webhook_state_current(self):
+        """
+        Checks the `WEBHOOK_STATE_PATH` file, if we already did set the webhook to our current url
+        in the last `WEBHOOK_STATE_MAX_AGE` seconds.
+
+        :rtype: bool
+        """
+        if not WEBHOOK_STATE_PATH:
+            return False
+        # end if
+        try:
+            with open(WEBHOOK_STATE_PATH, "rb") as f:
+                state = _json_loads(f.read())
+            # end with
+            return (
+                state["url_hash"] == self._webhook_state_hash()
+                and time.time() - state["timestamp"] < self.WEBHOOK_STATE_MAX_AGE
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            # missing, not readable or garbled file. Just ask telegram.
+            return False
+        # end try
+    # end def
+
+    def _remember_webhook_state(self):
+        """
+        Writes our current webhook url to the `WEBHOOK_STATE_PATH` file, if that is configured.
+        """
+        if not WEBHOOK_STATE_PATH:
+            return
+        # end if
+        # Write to a temporary file first and move that over the old one, so other processes (e.g. more workers
+        # starting at the same time) never read a half written file.
+        temp_path = f"{WEBHOOK_STATE_PATH}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(_json_dumps({"url_hash": self._webhook_state_hash(), "timestamp": time.time()}))
+            # end with
+            os.replace(temp_path, WEBHOOK_STATE_PATH)
+        except OSError:
+            logger.warning("Could not write webhook state to %r.", WEBHOOK_STATE_PATH, exc_info=True)
+        # end try
+    # end def
+
+    def _get_webhook_info_cached(self):
+        """
+        Like `self.bot.get_webhook_info()`, but reuses the result for `WEBHOOK_INFO_CACHE_SECONDS` seconds,
+        so repeatedly calling e.g. the status page doesn't do a request to telegram every time.
+
+        :return: the webhook info
+        :rtype: pytgbot.api_types.receivable.WebhookInfo | dict
+        """
+        fetched_at, webhook_info = self._webhook_info_cache
+        now = time.monotonic()
+        if webhook_info is None or now - fetched_at > self.WEBHOOK_INFO_CACHE_SECONDS:
+            webhook_info = self._bot.get_webhook_info()
+            self._webhook_info_cache = (now, webhook_info)
+        # end if
+        return webhook_info
+    # end def
+
     def do_startup(self):
         """
         This code is executed after server boot.
@@ -388,13 +754,32 @@ class TeleflaskBase(TeleflaskMixinBase):
         if not isinstance(string, str):
             string = str(string)
         # end if
-        return string.replace(self._api_key, "<API_KEY>")
+        if not string or not self.__api_key or self.__api_key not in string:
+            # nothing to replace, so we don't need to build a new copy of the string.
+            return string
+        # end if
+        return string.replace(self.__api_key, "<API_KEY>")
+    # end def
+
+    def _hide_api_key_bytes(self, data):
+        """
+        Like :meth:`hide_api_key`, but for already encoded (utf-8) `bytes`, e.g. serialized json.
+
+        :param data: The bytes which can contain the api key.
+        :type  data: bytes
+        :return: the bytes with the key replaced
+        :rtype: bytes
+        """
+        if not data or not self.__api_key_bytes or self.__api_key_bytes not in data:
+            return data
+        # end if
+        return data.replace(self.__api_key_bytes, b"<API_KEY>")
     # end def
 
     def jsonify(self, func):
         """
         Decorator.
-        Converts the returned value of the function to json, and sets mimetype to "text/json".
+        Converts the returned value of the function to json, and sets mimetype to "application/json".
         It will also automatically replace the api key where found in the output with "<API_KEY>".
 
         Usage:
@@ -424,49 +809,67 @@ class TeleflaskBase(TeleflaskMixinBase):
         :param func: the function to wrap
         :return: the wrapped function returning json responses.
         """
-        from functools import wraps
-        from flask import Response
-        import json
-        logger.debug("func: {}".format(func))
+        logger.debug("func: %s", func)
 
         @wraps(func)
         def jsonify_inner(*args, **kwargs):
             try:
                 result = func(*args, **kwargs)
-            except:
-                logger.exception("failed executing {name}.".format(name=func.__name__), exc_info=True)
+            except Exception:  # not catching KeyboardInterrupt or SystemExit.
+                logger.exception("failed executing %s.", func.__name__)
                 result = {"error": "exception raised"}, 503
             # end def
-            status = None  # will be 200 if not otherwise changed
-            if isinstance(result, tuple):
-                response, status = result
-            else:
-                response = result
-            # end if
-            if isinstance(response, Response):
-                if status:
-                    response.status_code = status
-                # end if
-                return response
-            # end if
-            if isinstance(response, TgBotApiObject):
-                response = response.to_array()
-            # end if
-            response = json.dumps(response)
-            # end if
-            assert isinstance(response, str)
-            response_kwargs = {}
-            response_kwargs.setdefault("mimetype", "text/json")
-            if status:
-                response_kwargs["status"] = status
-            # end if
-            res = Response(self.hide_api_key(response), **response_kwargs)
-            logger.debug("returning: {}".format(res))
+            res = self._result_response(result)
+            logger.debug("returning: %s", res)
             return res
         # end def inner
         return jsonify_inner
     # end def
 
+    def _result_response(self, result):
+        """
+        Converts the result of a view to a :class:`flask.Response`, with the special cases described in :meth:`jsonify`:
+        a `(data, status)` :class:`tuple`, a :class:`flask.Response` and a :class:`TgBotApiObject`.
+
+        :param result: What the view returned.
+
+        :rtype: Response
+        """
+        status = None  # will be 200 if not otherwise changed
+        if isinstance(result, tuple):
+            response, status = result
+        else:
+            response = result
+        # end if
+        if isinstance(response, Response):
+            if status:
+                response.status_code = status
+            # end if
+            return response
+        # end if
+        if isinstance(response, TgBotApiObject):
+            response = response.to_array()
+        # end if
+        return self._json_response(response, status=status or 200)
+    # end def
+
+    def _json_response(self, data, status=200):
+        """
+        Serializes `data` to a json :class:`flask.Response`, with the api key replaced by "<API_KEY>".
+        Unlike :meth:`jsonify` it doesn't handle any of the special cases, so `data` must be json serializable already.
+
+        :param data: The json data to send.
+        :type  data: dict | list
+
+        :param status: The http status code.
+        :type  status: int
+
+        :rtype: Response
+        """
+        body = _json_dumps(data)  # stays bytes, no need to decode and encode it again.
+        return Response(self._hide_api_key_bytes(body), mimetype="application/json", status=status)
+    # end def
+
     @_self_jsonify
     def view_exec(self, api_key, command):
         """
@@ -476,16 +879,16 @@ class TeleflaskBase(TeleflaskMixinBase):
         :param command: the actual command
         :return:
         """
-        if api_key != self._api_key:
+        # constant time comparison, so the time needed doesn't tell how much of the given key was correct.
+        if not self.__api_key_bytes or not hmac.compare_digest(api_key.encode("utf-8"), self.__api_key_bytes):
             error_msg = "Wrong API key: {wrong_key!r}".format(wrong_key=api_key)
             logger.warning(error_msg)
             return {"status": "error", "message": error_msg, "error_code": 403}, 403
         # end if
-        from flask import request
-        from pytgbot.exceptions import TgApiServerException
-        logger.debug("COMMAND: {cmd}, ARGS: {args}".format(cmd=command, args=request.args))
+        args = request.args.to_dict(flat=True)  # convert the MultiDict only once.
+        logger.debug("COMMAND: %s, ARGS: %s", command, args)
         try:
-            res = self.bot.do(command, **request.args)
+            res = self._bot.do(command, **args)
             if self._return_python_objects:
                 return res.to_array()
             else:
@@ -496,6 +899,7 @@ class TeleflaskBase(TeleflaskMixinBase):
         # end try
     # end def
 
+    @_cacheable
     @_self_jsonify
     def view_status(self):
         """
@@ -504,47 +908,125 @@ class TeleflaskBase(TeleflaskMixinBase):
         :return: webhook info
         """
         try:
-            res = self.bot.get_webhook_info()  # TODO: fix to work with return_python_objects==False
+            res = self._get_webhook_info_cached()  # TODO: fix to work with return_python_objects==False
             return res.to_array()
         except TgApiServerException as e:
             return {"status": "error", "message": e.description, "error_code": e.error_code}, e.error_code
         # end try
 
-    @_self_jsonify
     def view_updates(self):
         """
         This processes incoming telegram updates.
 
+        As this is called for every single update, it builds the json response directly
+        instead of going through the more generic :meth:`jsonify`.
+        The result of :meth:`process_update` is still handled like :meth:`jsonify` would,
+        so it can be a `(data, status)` :class:`tuple`, a :class:`flask.Response` or a :class:`TgBotApiObject`.
+
         :return:
         """
-        from pprint import pformat
-        from flask import request
-
-        logger.debug("INCOME:\n{}\n\nHEADER:\n{}".format(
-            pformat(request.get_json()),
-            request.headers if hasattr(request, "headers") else None
-        ))
-        update = TGUpdate.from_array(request.get_json())
+        try:
+            # Read the body without keeping an extra copy around (cache=False), and parse it only once.
+            payload = _json_loads(request.get_data(cache=False))
+            if logger.isEnabledFor(logging.DEBUG):  # pformat is expensive, only do it if it is logged at all.
+                logger.debug(
+                    "INCOME:\n%s\n\nHEADER:\n%s",
+                    pformat(payload), request.headers if hasattr(request, "headers") else None
+                )
+            # end if
+            update = TGUpdate.from_array(payload)
+        except Exception:
+            logger.exception("failed executing view_updates.")
+            return self._json_response({"error": "exception raised"}, status=503)
+        # end try
+        if self._update_queue is not None:
+            self._update_queue.put(update)
+            return self._json_response({"status": "queued"})
+        # end if
         try:
             result = self.process_update(update)
         except Exception as e:
             logger.exception("process_update()")
             result = {"status": "error", "message": str(e)}
         result = result if result else {"status": "probably ok"}
-        logger.info("returning result: {}".format(result))
-        return result
+        logger.info("returning result: %s", result)
+        return self._result_response(result)
     # end def
 
+    def _start_background_processing(self, app):
+        """
+        Starts the thread processing the updates `view_updates` queued, if `process_in_background` is set.
+        Does nothing if it is already running.
+
+        :param app: The flask app to provide the app context of the processing.
+        :type  app: flask.Flask
+        """
+        if self._update_thread is not None:
+            return
+        # end if
+        self._update_thread = threading.Thread(
+            target=self._process_queued_updates, args=(app,), name="teleflask-updates", daemon=True,
+        )
+        self._update_thread.start()
+    # end def
+
+    def stop_background_processing(self, timeout=None):
+        """
+        Stops the thread processing the updates in the background, see `process_in_background`.
+        Updates queued before are still processed, so call this when shutting down to not lose them.
+
+        :param timeout: Seconds to wait for the queued updates to be processed. `None` waits as long as it takes.
+        :type  timeout: None | float
+
+        :return: If the thread has ended, i.e. all queued updates are done.
+        :rtype: bool
+        """
+        thread = self._update_thread
+        if thread is None:
+            return True
+        # end if
+        self._update_queue.put(_STOP_PROCESSING)
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning("Background processing of the updates didn't end within %s seconds.", timeout)
+            return False
+        # end if
+        self._update_thread = None
+        return True
+    # end def
+
+    def _process_queued_updates(self, app):
+        """
+        Runs in the background thread started by :meth:`_start_background_processing`,
+        processing the updates `view_updates` has queued, one after another, until it gets the `_STOP_PROCESSING`.
+
+        :param app: The flask app to provide the app context of the processing.
+        :type  app: flask.Flask
+        """
+        with app.app_context():  # like the request did, so e.g. `current_app` works in the listeners.
+            while True:
+                update = self._update_queue.get()
+                if update is _STOP_PROCESSING:
+                    break
+                # end if
+                try:
+                    self.process_update(update)
+                except Exception:
+                    logger.exception("process_update()")
+                # end try
+            # end while
+        # end with
+    # end def
+
+    @_cacheable
     @_self_jsonify
     def view_host_info(self):
         """
         Get infos about your host, like IP etc.
         :return:
         """
-        import socket
-        import requests
-        info = requests.get('http://ipinfo.io').json()
-        info["host"] = socket.gethostname()
+        info = dict(_get_ipinfo(self.http))  # a copy, as we add our own keys.
+        info["host"] = _hostname
         info["version"] = self.VERSION
         return info
     # end def
@@ -552,38 +1034,32 @@ class TeleflaskBase(TeleflaskMixinBase):
     @_self_jsonify
     def view_routes_info(self):
         """
-        Get infos about your host, like IP etc.
+        Get infos about the registered routes of the flask app.
+
+        The list is built on the first call, and reused until `setup_routes(...)` adds routes again.
+        Flask doesn't allow adding routes once it handled the first request, so routes of your own app are included too.
         :return:
         """
-        from werkzeug.routing import Rule
-        routes = []
-        for rule in self.app.url_map.iter_rules():
-            assert isinstance(rule, Rule)
-            routes.append({
-                'methods': list(rule.methods),
-                'rule': rule.rule,
-                'endpoint': rule.endpoint,
-                'subdomain': rule.subdomain,
-                'redirect_to': rule.redirect_to,
-                'alias': rule.alias,
-                'host': rule.host,
-                'build_only': rule.build_only
-            })
-        # end for
+        routes = self._routes_info_cache
+        if routes is None:
+            routes = []
+            for rule in self.app.url_map.iter_rules():
+                route = dict(zip(_RULE_FIELDS, _get_rule_fields(rule)))
+                route['methods'] = list(route['methods'])  # it's a set, json can't do those.
+                routes.append(route)
+            # end for
+            self._routes_info_cache = routes
+        # end if
         return routes
     # end def
 
     @_self_jsonify
     def view_request(self):
         """
-        Get infos about your host, like IP etc.
+        Get the content of the current flask session.
         :return:
         """
-        import json
-        from flask import session
-        j = json.loads(json.dumps(session)),
-        # end for
-        return j
+        return dict(session)  # a plain dict, the jsonify serializes it anyway.
     # end def
 
     def get_router(self):
@@ -607,14 +1083,18 @@ class TeleflaskBase(TeleflaskMixinBase):
     def setup_routes(self, hookpath, debug_routes=False):
         """
         Sets the pathes to the registered blueprint/app:
-            - "webhook"  (self.view_updates) at hookpath
+            - "webhook"                   (self.view_updates) at hookpath
         Also, if `debug_routes` is `True`:
-            - "exec"     (self.view_exec)        at "/teleflask_debug/exec/API_KEY/<command>"  (`API_KEY` is replaced, `<command>` is any Telegram API command.)
-            - "status"   (self.view_status)      at "/teleflask_debug/status"
-            - "hostinfo" (self.view_host_info)   at "/teleflask_debug/hostinfo"
-            - "routes"   (self.view_routes_info) at "/teleflask_debug/routes"
+            - "teleflask_debug_exec"      (self.view_exec)        at "/teleflask_debug/exec/API_KEY/<command>"  (`API_KEY` is replaced, `<command>` is any Telegram API command.)
+            - "teleflask_debug_status"    (self.view_status)      at "/teleflask_debug/status"
+            - "teleflask_debug_hostinfo"  (self.view_host_info)   at "/teleflask_debug/hostinfo"
+            - "teleflask_debug_routes"    (self.view_routes_info) at "/teleflask_debug/routes"
+
+        The debug endpoints are prefixed with `teleflask_debug_`, so they don't collide with endpoints of your own app.
 
         :param hookpath: The path where it expects telegram updates to hit the flask app/blueprint.
+                         If called before there is an app (see `init_app(...)`), the ``{API_KEY}`` placeholder is
+                         filled in once it is added there.
         :type  hookpath: str
 
         :param debug_routes: Add several debug paths.
@@ -622,22 +1102,27 @@ class TeleflaskBase(TeleflaskMixinBase):
         """
         # Todo: Find out how to handle blueprints
         if not self.app and not self.blueprint:
-            raise ValueError("No app (self.app) or Blueprint (self.blueprint) was set.")
+            # no app (self.app) or Blueprint (self.blueprint) was set yet, so we do that once init_app(...) is called.
+            logger.debug("No app or blueprint yet, delaying setting up routes until init_app(...).")
+            self._pending_routes.append((hookpath, debug_routes))
+            return
         # end if
         router = self.get_router()
         if not self.disable_setting_webhook_route:
-            logger.info("Adding webhook route: {url!r}".format(url=hookpath))
+            logger.info("Adding webhook route: %r", hookpath)
             assert hookpath
             router.add_url_rule(hookpath, endpoint="webhook", view_func=self.view_updates, methods=['POST'])
         else:
             logger.info("Not adding webhook route, because disable_setting_webhook=True")
         # end if
         if debug_routes:
-            logger.info("Adding debug routes.".format(url=hookpath))
-            router.add_url_rule("/teleflask_debug/exec/{api_key}/<command>".format(api_key=self._api_key), endpoint="exec", view_func=self.view_exec)
-            router.add_url_rule("/teleflask_debug/status", endpoint="status", view_func=self.view_status)
-            router.add_url_rule("/teleflask_debug/routes", endpoint="routes", view_func=self.view_routes_info)
+            logger.info("Adding debug routes.")
+            router.add_url_rule(self._debug_exec_path, endpoint="teleflask_debug_exec", view_func=self.view_exec)
+            router.add_url_rule("/teleflask_debug/status", endpoint="teleflask_debug_status", view_func=self.view_status)
+            router.add_url_rule("/teleflask_debug/hostinfo", endpoint="teleflask_debug_hostinfo", view_func=self.view_host_info)
+            router.add_url_rule("/teleflask_debug/routes", endpoint="teleflask_debug_routes", view_func=self.view_routes_info)
         # end if
+        self._routes_info_cache = None  # the routes changed, so view_routes_info needs to list them again.
     # end def
 
     @abc.abstractmethod
@@ -660,16 +1145,20 @@ class TeleflaskBase(TeleflaskMixinBase):
         :return: List of telegram responses.
         :rtype: list
         """
-        from ..messages import Message
-        from ..new_messages import SendableMessageBase
-        reply_chat, reply_msg = self.msg_get_reply_params(update)
-        if isinstance(result, (SendableMessageBase, Message, str, list, tuple)):
+        if result is None or result is False:
+            # most listeners don't reply at all, so we don't even need to look for where to reply to.
+            logger.debug("Ignored result %r", result)
+            return
+        # end if
+        result_type = type(result)  # exact type checks first, as those are way cheaper than isinstance.
+        if (
+            result_type is str or result_type is list or result_type is tuple
+            or isinstance(result, (SendableMessageBase, Message, str, list, tuple))
+        ):
+            reply_chat, reply_msg = self.msg_get_reply_params(update)
             return list(self.send_messages(result, reply_chat, reply_msg))
-        elif result is False or result is None:
-            logger.debug("Ignored result {res!r}".format(res=result))
-            # ignore it
         else:
-            logger.warning("Unexpected plugin result: {type}".format(type=type(result)))
+            logger.warning("Unexpected plugin result: %s", type(result))
         # end if
     # end def
 
@@ -683,30 +1172,25 @@ class TeleflaskBase(TeleflaskMixinBase):
         :rtype: tuple(int,int)
         """
         assert_type_or_raise(update, TGUpdate, parameter_name="update")
-        assert isinstance(update, TGUpdate)
 
-        if update.message and update.message.migrate_to_chat_id:
-            return update.message.migrate_to_chat_id, update.message.message_id
-        # end if
-        if update.message and update.message.chat.id and update.message.message_id:
-            return update.message.chat.id, update.message.message_id
-        # end if
-        if update.channel_post and update.channel_post.chat.id and update.channel_post.message_id:
-            return update.channel_post.chat.id, update.channel_post.message_id
+        message = update.message
+        if message and message.migrate_to_chat_id:
+            return message.migrate_to_chat_id, message.message_id
         # end if
-        if update.edited_message and update.edited_message.chat.id and update.edited_message.message_id:
-            return update.edited_message.chat.id, update.edited_message.message_id
-        # end if
-        if update.edited_channel_post and update.edited_channel_post.chat.id and update.edited_channel_post.message_id:
-            return update.edited_channel_post.chat.id, update.edited_channel_post.message_id
-        # end if
-        if update.callback_query and update.callback_query.message:
-            message_id = update.callback_query.message.message_id if update.callback_query.message.message_id else None
-            if update.callback_query.message.chat and update.callback_query.message.chat.id:
-                return update.callback_query.message.chat.id, message_id
+        for get_message in _REPLY_MESSAGE_GETTERS:
+            message = get_message(update)
+            if message and message.chat.id and message.message_id:
+                return message.chat.id, message.message_id
+            # end if
+        # end for
+        message = update.callback_query.message if update.callback_query else None
+        if message:
+            message_id = message.message_id if message.message_id else None
+            if message.chat and message.chat.id:
+                return message.chat.id, message_id
             # end if
-            if update.callback_query.message.from_peer and update.callback_query.message.from_peer.id:
-                return update.callback_query.message.from_peer.id, message_id
+            if message.from_peer and message.from_peer.id:
+                return message.from_peer.id, message_id
             # end if
         # end if
         if update.inline_query and update.inline_query.from_peer and update.inline_query.from_peer.id:
@@ -719,10 +1203,10 @@ class TeleflaskBase(TeleflaskMixinBase):
         """
         Sends a Message.
         Plain strings will become an unformatted TextMessage.
-        Supports to mass send lists, tuples, Iterable.
+        Supports to mass send lists, tuples and generators.
 
         :param messages: A Message object.
-        :type  messages: Message | str | list | tuple |
+        :type  messages: Message | str | list | tuple | types.GeneratorType
         :param reply_chat: chat id
         :type  reply_chat: int
         :param reply_msg: message id
@@ -731,42 +1215,92 @@ class TeleflaskBase(TeleflaskMixinBase):
         False or None to wait until the plugin's function is done and has returned, messages the answers in a bulk.
         :type  instant: bool or None
         """
-        from pytgbot.exceptions import TgApiException
-        from ..messages import Message, TextMessage
-        from ..new_messages import SendableMessageBase
-
-        logger.debug("Got {}".format(messages))
-        if not isinstance(messages, (SendableMessageBase, Message, str, list, tuple)):
-            raise TypeError("Is not a Message type (or str or tuple/list).")
-        # end if
-        if isinstance(messages, tuple):
-            messages = [x for x in messages]
-        # end if
-        if not isinstance(messages, list):
-            messages = [messages]
-        # end if
-        assert isinstance(messages, list)
-        for msg in messages:
-            if isinstance(msg, str):
-                assert not isinstance(messages, str)  # because we would split a string to pieces.
+        logger.debug("Got %s", messages)  # lazy formatting, not building the string if debug logging is off.
+        prepared = []
+        for msg in _iter_messages(messages):
+            msg_type = type(msg)
+            if msg_type is str:
                 msg = TextMessage(msg, parse_mode="text")
-            # end if
-            if not isinstance(msg, (Message, SendableMessageBase)):
-                raise TypeError("Is not a Message/SendableMessageBase type.")
+            elif msg_type not in _known_message_types:
+                if isinstance(msg, _MESSAGE_TYPES):
+                    _known_message_types.add(msg_type)
+                elif isinstance(msg, str):
+                    msg = TextMessage(msg, parse_mode="text")
+                else:
+                    raise TypeError("Is not a Message/SendableMessageBase type.")
+                # end if
             # end if
             # if msg._next_msg:  # TODO: Reply message?
             #     message.insert(message.index(msg) + 1, msg._next_msg)
             #     msg._next_msg = None
-            from requests.exceptions import RequestException
             msg._apply_update_receiver(receiver=reply_chat, reply_id=reply_msg)
+            prepared.append(msg)
+        # end for
+        pool = self._get_send_pool() if len(prepared) > 1 else None
+        if pool:
+            # start sending all of them in parallel, the results are still yielded in the original order.
+            futures = [pool.submit(self._send_message, msg) for msg in prepared]
+        else:
+            futures = [None] * len(prepared)
+        # end if
+        for msg, future in zip(prepared, futures):
             try:
-                yield msg.send(self.bot)
+                yield future.result() if future else self._send_message(msg)
             except (TgApiException, RequestException):
-                logger.exception("Manager failed messages. Message was {msg!s}".format(msg=msg))
+                logger.exception("Manager failed messages. Message was %s", msg)
             # end try
         # end for
     # end def
 
+    def _send_message(self, msg):
+        """
+        Sends a single, already prepared message, honoring the `send_rate_limit`.
+        That takes one token of the limiter per message, however many api calls `msg.send(...)` does.
+        Retrying is done by the bot for every single api call (see `send_retries`), not for the whole message here,
+        as some messages consist of multiple calls, which would be sent again as well.
+
+        :param msg: The message with the receiver already applied.
+        :type  msg: Message | SendableMessageBase
+
+        :return: The result of `msg.send(...)`.
+        """
+        limiter = self._send_limiter
+        if limiter is None:
+            return msg.send(self._bot)
+        # end if
+        limiter.acquire()
+        try:
+            result = msg.send(self._bot)
+        except TgApiServerException as e:
+            retry_after = get_retry_after(e)
+            if retry_after:
+                limiter.pause(retry_after)
+            # end if
+            raise
+        # end try
+        retry_after = get_result_retry_after(result)  # returned instead of raised, with `return_python_objects=False`.
+        if retry_after:
+            limiter.pause(retry_after)
+        # end if
+        return result
+    # end def
+
+    def _get_send_pool(self):
+        """
+        Returns the thread pool used to send multiple messages in parallel,
+        or `None` if they should be sent one after another (`send_workers` is 1).
+
+        :rtype: None | ThreadPoolExecutor
+        """
+        if self._send_workers <= 1:
+            return None
+        # end if
+        if self._send_pool is None:
+            self._send_pool = ThreadPoolExecutor(max_workers=self._send_workers, thread_name_prefix="teleflask-send")
+        # end if
+        return self._send_pool
+    # end def
+
     def send_message(self, messages, reply_chat, reply_msg):
         """
         Backwards compatible version of send_messages.
@@ -778,6 +1312,7 @@ class TeleflaskBase(TeleflaskMixinBase):
         :type  reply_msg: int
         :return: None
         """
-        list(self.send_messages(messages, reply_chat=reply_chat, reply_msg=reply_msg))
+        _consume(self.send_messages(messages, reply_chat=reply_chat, reply_msg=reply_msg))
         return None
+    # end def
 # end class
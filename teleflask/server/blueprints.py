@@ -17,6 +17,8 @@ class TBlueprintSetupState(object):
     :meth:`~teleflask.TBlueprint.make_setup_state` method and later passed
     to all register callback functions.
     """
+    # '__dict__' keeps setting other attributes working, e.g. by subclasses or register callbacks.
+    __slots__ = ('teleflask', 'tblueprint', 'options', 'first_registration', '__dict__')
 
     def __init__(self, tblueprint, teleflask, options, first_registration):
         #: a reference to the current application
@@ -45,6 +47,7 @@ class TBlueprint(AbstractBotCommands, AbstractMessages, AbstractRegisterBlueprin
         self.name = name
         self.deferred_functions = []
         self._got_registered_once = False
+        self._teleflask = None  # will be set by self.register(...)
     # end def
 
     def register(self, teleflask, options, first_registration=False):
@@ -244,13 +247,14 @@ class TBlueprint(AbstractBotCommands, AbstractMessages, AbstractRegisterBlueprin
 
     @property
     def teleflask(self):
-        if not self._got_registered_once:
-            raise AssertionError('Not registered to an Teleflask instance yet.')
-        # end if
-        if not self._teleflask:
+        teleflask = self._teleflask  # only set by self.register(...), so one check covers both cases.
+        if teleflask is None:
+            if not self._got_registered_once:
+                raise AssertionError('Not registered to an Teleflask instance yet.')
+            # end if
             raise AssertionError('No Teleflask instance yet. Did you register it?')
         # end if
-        return self._teleflask
+        return teleflask
 
     @property
     def bot(self):
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+import time
+import threading
+from collections import deque
+
+from luckydonaldUtils.logger import logging
+
+__author__ = 'luckydonald'
+__all__ = ['RetryGuard', 'get_retry_guard']
+logger = logging.getLogger(__name__)
+
+
+class RetryGuard(object):
+    """
+    A circuit breaker for retries.
+
+    It keeps track of the outcome of the requests in the last `window` seconds.
+    If more than `threshold` of them were rejected (e.g. telegram being down or rate limiting us)
+    for longer than `open_after` seconds, it opens: :meth:`allow` returns `False`, and no more retries should be done.
+    That way a outage isn't made worse by every message being tried multiple times.
+    After `probe_after` seconds a single retry is allowed again, which closes it if it succeeds.
+    """
+    __slots__ = (
+        'window', 'threshold', 'open_after', 'probe_after',
+        '_events', '_rejections', '_over_since', '_opened_at', '_probing', '_lock',
+    )
+
+    def __init__(self, window=30.0, threshold=0.2, open_after=5.0, probe_after=10.0):
+        """
+        :param window: The seconds of history the rejection rate is calculated over.
+        :type  window: float
+
+        :param threshold: The rejection rate (0 to 1) above which the requests are considered failing.
+        :type  threshold: float
+
+        :param open_after: How many seconds the rejection rate must stay above `threshold` before disabling retries.
+        :type  open_after: float
+
+        :param probe_after: How many seconds after disabling retries a single retry is allowed again.
+        :type  probe_after: float
+        """
+        self.window = window
+        self.threshold = threshold
+        self.open_after = open_after
+        self.probe_after = probe_after
+        self._events = deque()  # (time.monotonic(), rejected)
+        self._rejections = 0  # how many of self._events are rejected ones.
+        self._over_since = None  # when the rejection rate went above the threshold, or None if it isn't.
+        self._opened_at = None  # when retries got disabled, or None if they are allowed.
+        self._probing = False  # if the single retry allowed after probe_after is currently done.
+        self._lock = threading.Lock()
+    # end def
+
+    @property
+    def is_open(self):
+        """
+        If retries are currently disabled.
+
+        :rtype: bool
+        """
+        return self._opened_at is not None
+    # end def
+
+    def allow(self):
+        """
+        If a retry should be done.
+
+        :rtype: bool
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            # end if
+            if not self._probing and time.monotonic() - self._opened_at >= self.probe_after:
+                self._probing = True
+                return True
+            # end if
+            return False
+        # end with
+    # end def
+
+    def record(self, rejected):
+        """
+        Records the outcome of a request.
+
+        :param rejected: If the request failed with a temporary error, see :func:`teleflask.server.retry.is_recoverable`.
+        :type  rejected: bool
+        """
+        now = time.monotonic()
+        with self._lock:
+            events = self._events
+            events.append((now, rejected))
+            self._rejections += rejected
+            while events[0][0] < now - self.window:
+                self._rejections -= events.popleft()[1]
+            # end while
+            if self._probing:
+                self._probing = False
+                if rejected:
+                    self._opened_at = now  # still failing, wait another probe_after.
+                    return
+                # end if
+                logger.info('Sending works again, enabling retries.')
+                events.clear()
+                self._rejections = 0
+                self._over_since = None
+                self._opened_at = None
+                return
+            # end if
+            if self._rejections / len(events) <= self.threshold:
+                self._over_since = None
+                return
+            # end if
+            if self._over_since is None:
+                self._over_since = now
+            elif self._opened_at is None and now - self._over_since > self.open_after:
+                logger.warning(
+                    'More than %d%% of the requests failed in the last %d seconds, disabling retries.',
+                    self.threshold * 100, self.window,
+                )
+                self._opened_at = now
+            # end if
+        # end with
+    # end def
+# end class
+
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def get_retry_guard(key):
+    """
+    Returns the :class:`RetryGuard` for the given bot, shared by every Teleflask instance of this process using it.
+
+    :param key: The api key of the bot.
+    :type  key: str
+
+    :rtype: RetryGuard
+    """
+    guard = _guards.get(key)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.setdefault(key, RetryGuard())
+        # end with
+    # end if
+    return guard
+# end def
@@ -2,6 +2,7 @@
 import os
 
 from .base import TeleflaskBase
+from .pooling import DEFAULT_POOL_SIZE
 from .mixins import StartupMixin, BotCommandsMixin, UpdatesMixin, MessagesMixin, RegisterBlueprintsMixin
 from luckydonaldUtils.logger import logging
 
@@ -55,7 +56,8 @@ class Teleflask(StartupMixin, BotCommandsMixin, MessagesMixin, UpdatesMixin, Reg
     def __init__(
         self, api_key, app=None, blueprint=None, hostname=None, hostpath=None, hookpath="/income/{API_KEY}",
         debug_routes=False, disable_setting_webhook_telegram=None, disable_setting_webhook_route=None,
-        return_python_objects=True
+        return_python_objects=True, connection_pool_size=DEFAULT_POOL_SIZE, send_workers=1, process_in_background=False,
+        send_rate_limit=None, send_retries=0,
     ):
         """
         A new Teleflask object.
@@ -96,11 +98,44 @@ class Teleflask(StartupMixin, BotCommandsMixin, MessagesMixin, UpdatesMixin, Reg
         :type  disable_setting_webhook_route: None|bool
 
         :param return_python_objects: Enable return_python_objects in pytgbot. See pytgbot.bot.Bot
+
+        :param connection_pool_size: How many connections to the Telegram API are kept open for reuse.
+        :type  connection_pool_size: int
+
+        :param send_workers: How many messages of a single result are sent to telegram at the same time.
+                             Defaults to 1, sending them one after another.
+                             Note: With more than 1 the order the messages arrive in the chat is not guaranteed any longer.
+        :type  send_workers: int
+
+        :param process_in_background: Answer telegram's webhook request right away, and process the update afterwards
+                                      in a background thread. Any result is then sent via the bot api,
+                                      instead of being part of the webhook response.
+                                      The thread is started by :meth:`init_app`, and ended by :meth:`stop_background_processing`.
+                                      Note: As telegram already got its answer, updates still queued when the process
+                                      exits (or crashes) are lost. Telegram won't send them again.
+        :type  process_in_background: bool
+
+        :param send_rate_limit: How many messages are sent per second at most, e.g. `30` for telegram's global limit.
+                                If telegram still answers with `429 Too Many Requests`, all sending
+                                is paused for the `retry_after` seconds given by telegram.
+                                Counted per message, even if sending it needs several api calls
+                                (e.g. a chat action before it, or a text split into multiple parts).
+                                Defaults to `None`, not limiting at all.
+        :type  send_rate_limit: None | int
+
+        :param send_retries: How often a single request to telegram is sent again, if it failed with a temporary error
+                             (`429 Too Many Requests`, `5xx` or no connection), waiting a bit longer every time.
+                             Retries stop while most of the requests fail anyway.
+                             Defaults to 0, never retrying.
+        :type  send_retries: int
         """
         super().__init__(
             api_key=api_key, app=app, blueprint=blueprint, hostname=hostname, hookpath=hookpath,
             debug_routes=debug_routes, disable_setting_webhook_telegram=disable_setting_webhook_telegram,
             disable_setting_webhook_route=disable_setting_webhook_route, return_python_objects=return_python_objects,
+            connection_pool_size=connection_pool_size, send_workers=send_workers,
+            process_in_background=process_in_background, send_rate_limit=send_rate_limit,
+            send_retries=send_retries,
         )
 
     # end def
@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 import logging
 from abc import abstractmethod
-from collections import OrderedDict
 
 from pytgbot.api_types.receivable.updates import Update
 
@@ -14,6 +13,77 @@ __all__ = ['BotCommandsMixin', 'MessagesMixin', 'RegisterBlueprintsMixin', 'Star
 logger = logging.getLogger(__name__)
 
 
+def _freeze_listeners(listeners):
+    """
+    Builds the snapshot `process_update` iterates, out of the `{func: [required_keywords, ...]}` dict of listeners.
+    The required keywords become frozensets (or `None` to allow all), so they can be checked with a single `<=`
+    against the fields present in an update.
+    Also the listeners are indexed by the fields they require, so only the ones interested in the fields
+    an update actually has need to be looked at (see :func:`_iter_listeners`).
+
+    :param listeners: `self.update_listeners` or `self.message_listeners`.
+    :type  listeners: dict
+
+    :return: `{field: (index, ...)}` of the listeners requiring a field, the indexes of the listeners allowing all,
+             and the tuple of `(listener, (required_keywords, ...))` those indexes point to.
+    :rtype: tuple(dict, tuple, tuple)
+    """
+    entries = []
+    by_field = {}
+    catchall = []
+    for index, (listener, required_fields_array) in enumerate(listeners.items()):
+        required_fields_array = tuple(
+            frozenset(required_fields) if required_fields else None for required_fields in required_fields_array
+        )
+        entries.append((listener, required_fields_array))
+        if None in required_fields_array:
+            catchall.append(index)
+            continue
+        # end if
+        for field in frozenset().union(*required_fields_array):
+            by_field.setdefault(field, []).append(index)
+        # end for
+    # end for
+    by_field = {field: tuple(indexes) for field, indexes in by_field.items()}
+    return by_field, tuple(catchall), tuple(entries)
+# end def
+
+
+def _iter_listeners(snapshot, obj):
+    """
+    Yields the `(listener, required_fields)` of the snapshot made by :func:`_freeze_listeners` which match `obj`,
+    in the order they were added. Every listener is yielded once at most, with its first matching combination.
+
+    A field counts as present, if `obj` has it, and it isn't empty (like `None`).
+
+    :param snapshot: The result of :func:`_freeze_listeners`.
+    :type  snapshot: tuple(dict, tuple, tuple)
+
+    :param obj: The update (or message) to match.
+    """
+    by_field, catchall, entries = snapshot
+    present = {field for field in by_field if getattr(obj, field, None)}  # checked once, not per listener.
+    if present:
+        indexes = set(catchall)
+        for field in present:
+            indexes.update(by_field[field])
+        # end for
+        indexes = sorted(indexes)
+    else:
+        indexes = catchall  # already sorted.
+    # end if
+    for index in indexes:
+        listener, required_fields_array = entries[index]
+        for required_fields in required_fields_array:
+            if required_fields is None or required_fields <= present:
+                yield listener, required_fields
+                break  # stop processing other required_fields combinations
+            # end if
+        # end for
+    # end for
+# end def
+
+
 class UpdatesMixin(TeleflaskMixinBase, AbstractUpdates):
     """
     This mixin allows you to register functions to listen on updates.
@@ -42,10 +112,11 @@ class UpdatesMixin(TeleflaskMixinBase, AbstractUpdates):
 
     """
     def __init__(self, *args, **kwargs):
-        self.update_listeners = OrderedDict()  # Python3.6, dicts are sorted # Schema:
+        self.update_listeners = dict()  # dicts keep the insertion order (guaranteed since Python 3.7)
         # Schema: {func: [ ["message", "key", "..."] ]}  or  {func: None} for wildcard.
         #                [ ['A', 'B'], ['C'] ] == 'A' and 'B' or 'C'
         #                [ ]  means 'allow all'.
+        self._update_listeners_snapshot = ({}, (), ())  # frozen, indexed copy of the above, see _freeze_listeners(...).
 
         super(UpdatesMixin, self).__init__(*args, **kwargs)
     # end def
@@ -104,6 +175,7 @@ class UpdatesMixin(TeleflaskMixinBase, AbstractUpdates):
         if required_keywords is None:
             self.update_listeners[function] = [None]
             logging.debug("listener required keywords set to allow all.")
+            self._freeze_update_listeners()
             return function
         # end def
 
@@ -129,16 +201,26 @@ class UpdatesMixin(TeleflaskMixinBase, AbstractUpdates):
                 logger.debug('listener not updated, as it is already wildcard')
             elif required_keywords in self.update_listeners[function]:
                 # the keywords already are required, we don't need to add a filter
-                logger.debug("listener required keywords already in {!r}".format(self.update_listeners[function]))
+                logger.debug("listener required keywords already in %r", self.update_listeners[function])
             else:
                 # add another case
                 self.update_listeners[function].append(required_keywords)  # Outer list = OR, required_keywords = AND
-                logger.debug("listener required keywords updated to {!r}".format(self.update_listeners[function]))
+                logger.debug("listener required keywords updated to %r", self.update_listeners[function])
             # end if
         # end if
+        self._freeze_update_listeners()
         return function
     # end def add_update_listener
 
+    def _freeze_update_listeners(self):
+        """
+        Updates the frozen, indexed copy of `self.update_listeners` which `process_update` iterates.
+        So (un)registering listeners while an update is processed doesn't break the iteration,
+        it simply takes effect with the next update.
+        """
+        self._update_listeners_snapshot = _freeze_listeners(self.update_listeners)
+    # end def
+
     def remove_update_listener(self, func):
         """
         Removes an function from the update listener list.
@@ -150,7 +232,8 @@ class UpdatesMixin(TeleflaskMixinBase, AbstractUpdates):
         :return: the function, unmodified
         """
         if func in self.update_listeners:
-           del self.update_listeners[func]
+            del self.update_listeners[func]
+            self._freeze_update_listeners()
         else:
             logger.warning("listener already removed.")
         # end if
@@ -167,25 +250,19 @@ class UpdatesMixin(TeleflaskMixinBase, AbstractUpdates):
         :return: nothing.
         """
         assert isinstance(update, Update)  # Todo: non python objects
-        for listener, required_fields_array in self.update_listeners.items():
-            for required_fields in required_fields_array:
-                try:
-                    if not required_fields or all([hasattr(update, f) and getattr(update, f) for f in required_fields]):
-                        # either filters evaluates to False, (None, empty list etc) which means it should not filter
-                        # or it has filters, than we need to check if that attributes really exist.
-                        self.process_result(update, listener(update))  # this will be TeleflaskMixinBase.process_result()
-                        break  # stop processing other required_fields combinations
-                    # end if
-                except AbortProcessingPlease as e:
-                    logger.debug('Asked to stop processing updates.')
-                    if e.return_value:
-                        self.process_result(update, e.return_value)
-                    # end if
-                    return  # not calling super().process_update(update)
-                except Exception:
-                    logger.exception("Error executing the update listener {func}.".format(func=listener))
-                # end try
-            # end for
+        # only the listeners without filter, or with all the required fields present. See _freeze_listeners(...).
+        for listener, required_fields in _iter_listeners(self._update_listeners_snapshot, update):
+            try:
+                self.process_result(update, listener(update))  # this will be TeleflaskMixinBase.process_result()
+            except AbortProcessingPlease as e:
+                logger.debug('Asked to stop processing updates.')
+                if e.return_value:
+                    self.process_result(update, e.return_value)
+                # end if
+                return  # not calling super().process_update(update)
+            except Exception:
+                logger.exception("Error executing the update listener %s.", listener)
+            # end try
         # end for
         super().process_update(update)
     # end def process_update
@@ -232,6 +309,7 @@ class MessagesMixin(TeleflaskMixinBase, AbstractMessages):
 
     def __init__(self, *args, **kwargs):
         self.message_listeners = dict()  # key: func, value: [ ["arg", "arg2"], ["arg2"] ]
+        self._message_listeners_snapshot = ({}, (), ())  # frozen, indexed copy of the above, see _freeze_listeners(...).
         super(MessagesMixin, self).__init__(*args, **kwargs)
     # end def
 
@@ -304,6 +382,7 @@ class MessagesMixin(TeleflaskMixinBase, AbstractMessages):
         if required_keywords is None:
             self.message_listeners[function] = [None]
             logging.debug("listener required keywords set to allow all.")
+            self._freeze_message_listeners()
             return function
         # end def
 
@@ -329,15 +408,25 @@ class MessagesMixin(TeleflaskMixinBase, AbstractMessages):
                 logger.debug('listener not updated, as it is already wildcard')
             elif required_keywords in self.message_listeners[function]:
                 # the keywords already are required, we don't need to add a filter
-                logger.debug("listener required keywords already in {!r}".format(self.message_listeners[function]))
+                logger.debug("listener required keywords already in %r", self.message_listeners[function])
             else:
                 self.message_listeners[function].append(required_keywords)
-                logger.debug("listener required keywords updated to {!r}".format(self.message_listeners[function]))
+                logger.debug("listener required keywords updated to %r", self.message_listeners[function])
             # end if
         # end if
+        self._freeze_message_listeners()
         return function
     # end def add_message_listener
 
+    def _freeze_message_listeners(self):
+        """
+        Updates the frozen, indexed copy of `self.message_listeners` which `process_update` iterates.
+        So (un)registering listeners while an update is processed doesn't break the iteration,
+        it simply takes effect with the next update.
+        """
+        self._message_listeners_snapshot = _freeze_listeners(self.message_listeners)
+    # end def
+
     def remove_message_listeners(self, func):
         """
         Removes an function from the message listener list.
@@ -350,6 +439,7 @@ class MessagesMixin(TeleflaskMixinBase, AbstractMessages):
         """
         if func in self.message_listeners:
             del self.message_listeners[func]
+            self._freeze_message_listeners()
         else:
             logger.warning("listener already removed.")
         # end if
@@ -368,25 +458,19 @@ class MessagesMixin(TeleflaskMixinBase, AbstractMessages):
         assert isinstance(update, Update)
         if update.message:
             msg = update.message
-            for listener, required_fields_array in self.message_listeners.items():
-                for required_fields in required_fields_array:
-                    try:
-                        if not required_fields or all([hasattr(msg, f) and getattr(msg, f) for f in required_fields]):
-                            # either filters evaluates to False, (None, empty list etc) which means it should not filter
-                            # or it has filters, than we need to check if that attributes really exist.
-                            self.process_result(update, listener(update, update.message))
-                            break  # stop processing other required_fields combinations
-                        # end if
-                    except AbortProcessingPlease as e:
-                        logger.debug('Asked to stop processing updates.')
-                        if e.return_value:
-                            self.process_result(update, e.return_value)
-                        # end if
-                        return  # not calling super().process_update(update)
-                    except Exception:
-                        logger.exception("Error executing the update listener {func}.".format(func=listener))
-                    # end try
-                # end for
+            # only the listeners without filter, or with all the required fields present. See _freeze_listeners(...).
+            for listener, required_fields in _iter_listeners(self._message_listeners_snapshot, msg):
+                try:
+                    self.process_result(update, listener(update, msg))
+                except AbortProcessingPlease as e:
+                    logger.debug('Asked to stop processing updates.')
+                    if e.return_value:
+                        self.process_result(update, e.return_value)
+                    # end if
+                    return  # not calling super().process_update(update)
+                except Exception:
+                    logger.exception("Error executing the update listener %s.", listener)
+                # end try
             # end for
         # end if
         super().process_update(update)
@@ -528,7 +612,7 @@ class BotCommandsMixin(TeleflaskMixinBase, AbstractBotCommands):
                 if cmd not in self.commands:
                     continue
                 # end if
-                logger.debug("Deleting command {cmd!r}: {func}".format(cmd=cmd, func=self.commands[cmd]))
+                logger.debug("Deleting command %r: %s", cmd, self.commands[cmd])
                 del self.commands[cmd]
             # end for
         # end if
@@ -561,7 +645,7 @@ class BotCommandsMixin(TeleflaskMixinBase, AbstractBotCommands):
             txt = update.message.text.strip()
             func = None
             if txt in self.commands:
-                logger.debug("Running command {input} (no text).".format(input=txt))
+                logger.debug("Running command %s (no text).", txt)
                 func, exclusive = self.commands[txt]
                 try:
                     self.process_result(update, func(update, None))
@@ -572,11 +656,11 @@ class BotCommandsMixin(TeleflaskMixinBase, AbstractBotCommands):
                     # end if
                     return  # not calling super().process_update(update)
                 except Exception:
-                    logger.exception("Failed calling command {cmd!r} ({func}):".format(cmd=txt, func=func))
+                    logger.exception("Failed calling command %r (%s):", txt, func)
                 # end try
             elif " " in txt and txt.split(" ")[0] in self.commands:
                 cmd, text = tuple(txt.split(" ", maxsplit=1))
-                logger.debug("Running command {cmd} (text={input!r}).".format(cmd=cmd, input=txt))
+                logger.debug("Running command %s (text=%r).", cmd, txt)
                 func, exclusive = self.commands[cmd]
                 try:
                     self.process_result(update, func(update, text.strip()))
@@ -587,18 +671,14 @@ class BotCommandsMixin(TeleflaskMixinBase, AbstractBotCommands):
                     # end if
                     return  # not calling super().process_update(update)
                 except Exception:
-                    logger.exception("Failed calling command {cmd!r} ({func}):".format(cmd=txt, func=func))
+                    logger.exception("Failed calling command %r (%s):", txt, func)
                 # end try
             else:
                 logging.debug("No fitting registered command function found.")
                 exclusive = False  # so It won't abort.
             # end if
             if exclusive:
-                logger.debug(
-                    "Command function {func!r} ({cmd}) marked exclusive, stopping further processing.".format(
-                        func=func, cmd=cmd
-                    )
-                )
+                logger.debug("Command function %r (%s) marked exclusive, stopping further processing.", func, cmd)
                 return  # not calling super().process_update(update)
             # end if
         # end if
@@ -709,7 +789,7 @@ class StartupMixin(TeleflaskMixinBase, AbstractStartup):
             try:
                 listener()
             except Exception:
-                logger.exception("Error executing the startup listener {func}.".format(func=listener))
+                logger.exception("Error executing the startup listener %s.", listener)
                 raise
             # end if
         # end for
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry  # should be installed by requests
+
+from pytgbot import Bot
+from pytgbot.exceptions import TgApiServerException
+from luckydonaldUtils.logger import logging
+
+from .retry import is_recoverable, retry_send
+
+__author__ = 'luckydonald'
+__all__ = ['DEFAULT_POOL_SIZE', 'POLLING_POOL_SIZE', 'HTTP_POOL_SIZE', 'create_session', 'create_http_session', 'PooledBot']
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_POOL_SIZE = 32  # connections kept open for outgoing calls, e.g. sending messages.
+POLLING_POOL_SIZE = 4  # connections kept open for long polling (`get_updates`), so it can't starve sending.
+HTTP_POOL_SIZE = 8  # connections kept open for other requests, e.g. to ipinfo.io.
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE):
+    """
+    Creates a :class:`requests.Session` keeping up to `pool_size` connections per host alive,
+    so subsequent requests can reuse already established (TLS) connections.
+
+    Note: Unlike e.g. curl, `requests` never sends a `Expect: 100-continue` header for uploads,
+    so there is no extra round trip waiting for the `100 Continue` before the body is sent.
+
+    :param pool_size: How many connections to keep open per host.
+    :type  pool_size: int
+
+    :return: the new session
+    :rtype: requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+# end def
+
+
+def create_http_session(pool_size=HTTP_POOL_SIZE):
+    """
+    Creates a :class:`requests.Session` for requests not going to telegram, like looking up our ip at ipinfo.io.
+    Other than :func:`create_session` it retries failed connections twice, as those calls are all idempotent `GET`s.
+
+    :param pool_size: How many connections to keep open per host.
+    :type  pool_size: int
+
+    :return: the new session
+    :rtype: requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=Retry(total=2, backoff_factor=0.2))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+# end def
+
+
+class _TemporaryErrorAnswer(TgApiServerException):
+    """
+    Raised by :meth:`PooledBot._post` for a temporary error telegram answered with (`429` or `5xx`),
+    even if pytgbot would return that answer (`return_python_objects=False`), so :func:`retry_send` can retry it.
+    """
+    def __init__(self, result, **kwargs):
+        super().__init__(**kwargs)
+        self.result = result  # what pytgbot would have returned.
+    # end def
+# end class
+
+
+class PooledBot(Bot):
+    """
+    A :class:`pytgbot.Bot` doing all the requests to the Telegram API over a single :class:`requests.Session`,
+    instead of creating a new connection for every call.
+
+    Optionally a single api call failing with a temporary error is sent again, see `retries`.
+    """
+    def __init__(self, api_key, return_python_objects=True, session=None, retries=0, retry_guard=None):
+        """
+        :param api_key: The key for the telegram bot api.
+        :type  api_key: str
+
+        :param return_python_objects: Enable return_python_objects in pytgbot. See pytgbot.bot.Bot
+
+        :param session: The session to use. If `None`, a new one is created with :func:`create_session`.
+        :type  session: None | requests.Session
+
+        :param retries: How often a request failing with a temporary error is sent again,
+                        see :func:`teleflask.server.retry.retry_send`. Defaults to 0, never retrying.
+                        Requests uploading files are never retried, as the files are already read.
+        :type  retries: int
+
+        :param retry_guard: Stops retrying while most of the requests fail anyway.
+        :type  retry_guard: None | teleflask.server.breaker.RetryGuard
+        """
+        self.session = session if session is not None else create_session()
+        self.retries = retries
+        self.retry_guard = retry_guard
+        super().__init__(api_key, return_python_objects=return_python_objects)
+    # end def
+
+    def do(self, command, files=None, use_long_polling=False, request_timeout=None, **query):
+        """
+        Like the original `pytgbot.Bot.do`, but sending the request with our `self.session`.
+        All the api methods end up here, including the file uploads (`_do_fileupload`).
+        """
+        url, params, query_files = self._prepare_request(command, query)  # pytgbot >= 5 also collects the InputFiles.
+        if query_files:
+            files = dict(files, **query_files) if files else query_files
+        # end if
+        if self.retries <= 0 or files:
+            return self._post(url, params, files, use_long_polling, request_timeout)
+        # end if
+        try:
+            return retry_send(
+                lambda: self._post(url, params, None, use_long_polling, request_timeout, raise_temporary=True),
+                max_retries=self.retries, guard=self.retry_guard,
+            )
+        except _TemporaryErrorAnswer as e:  # still failing after the retries, so answer like without retrying.
+            return e.result
+        # end try
+    # end def
+
+    def _post(self, url, params, files, use_long_polling, request_timeout, raise_temporary=False):
+        """
+        Sends a single request to the Telegram API, without any retries.
+
+        :param raise_temporary: With `return_python_objects=False` pytgbot returns error answers instead of raising.
+                                If set, a temporary error (see :func:`is_recoverable`) is raised anyway,
+                                as a :class:`_TemporaryErrorAnswer`.
+        :type  raise_temporary: bool
+        """
+        r = self.session.post(
+            url, params=params, files=files, stream=use_long_polling,
+            verify=True,  # No self signed certificates. Telegram should be trustworthy anyway...
+            timeout=request_timeout
+        )
+        try:
+            json = r.json()
+        except ValueError:  # not an api answer, e.g. a `502 Bad Gateway` page of a proxy in between.
+            r.raise_for_status()
+            raise
+        # end try
+        result = self._postprocess_request(r.request, response=r, json=json)
+        if raise_temporary and not self.return_python_objects and result.get("ok") is False:
+            error = _TemporaryErrorAnswer(
+                result, error_code=result.get("error_code"), response=r, description=result.get("description"),
+                request=r.request,
+            )
+            if is_recoverable(error):
+                raise error
+            # end if
+        # end if
+        return result
+    # end def
+# end class
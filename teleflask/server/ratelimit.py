@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import time
+import threading
+
+from luckydonaldUtils.logger import logging
+
+__author__ = 'luckydonald'
+__all__ = ['TELEGRAM_RATE_LIMIT', 'RateLimiter', 'get_retry_after', 'get_result_retry_after']
+logger = logging.getLogger(__name__)
+
+
+TELEGRAM_RATE_LIMIT = 30  # messages per second a bot may send in total, see https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this
+_EPSILON = 1e-9  # tokens missing to a full one which are still counted as a full one.
+_MIN_WAIT = 0.001  # seconds to sleep at least, so the clock advances enough to refill something.
+
+
+class RateLimiter(object):
+    """
+    A thread safe token bucket, allowing up to `rate` calls of :meth:`acquire` per `per` seconds.
+    Additionally all callers can be stalled with :meth:`pause`, e.g. when telegram asks us to `retry_after` some seconds.
+    """
+    __slots__ = ('rate', 'per', '_tokens', '_last', '_paused_until', '_lock')
+
+    def __init__(self, rate=TELEGRAM_RATE_LIMIT, per=1.0):
+        """
+        :param rate: How many calls are allowed in `per` seconds. Also the size of a burst.
+        :type  rate: int
+
+        :param per: The timespan in seconds.
+        :type  per: float
+        """
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    # end def
+
+    def acquire(self):
+        """
+        Blocks until the next call is allowed.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate / self.per)
+                    self._last = now
+                    if self._tokens >= 1 - _EPSILON:  # refilling in float steps may land a hair below 1.
+                        self._tokens -= 1
+                        return
+                    # end if
+                    wait = max(_MIN_WAIT, (1 - self._tokens) * self.per / self.rate)
+                # end if
+            # end with
+            time.sleep(wait)
+        # end while
+    # end def
+
+    def pause(self, seconds):
+        """
+        Don't allow any calls for the next `seconds` seconds.
+
+        :param seconds: How long to stall all callers of :meth:`acquire`.
+        :type  seconds: float
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        # end with
+        logger.warning('Pausing sending for %s seconds.', seconds)
+    # end def
+# end class
+
+
+def get_retry_after(exception):
+    """
+    Extracts the `retry_after` telegram sends along with `429 Too Many Requests` errors.
+
+    :param exception: The exception raised by the bot api call.
+    :type  exception: Exception
+
+    :return: The seconds to wait, or `None` if the error isn't a rate limit one.
+    :rtype: None | int
+    """
+    if getattr(exception, 'error_code', None) != 429:
+        return None
+    # end if
+    response = getattr(exception, 'response', None)
+    try:
+        return int(response.json()['parameters']['retry_after'])
+    except Exception:
+        logger.debug('Could not read retry_after from the response %r', response)
+        return None
+    # end try
+# end def
+
+
+def get_result_retry_after(result):
+    """
+    Like :func:`get_retry_after`, but for the error answer pytgbot returns instead of raising,
+    if the bot has `return_python_objects=False`.
+
+    :param result: The result of the bot api call.
+
+    :return: The seconds to wait, or `None` if the result isn't a rate limit error.
+    :rtype: None | int
+    """
+    if not isinstance(result, dict) or result.get("ok") is not False or result.get("error_code") != 429:
+        return None
+    # end if
+    try:
+        return int(result["parameters"]["retry_after"])
+    except Exception:
+        logger.debug('Could not read retry_after from the result %r', result)
+        return None
+    # end try
+# end def
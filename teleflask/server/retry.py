@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import time
+import random
+
+from requests.exceptions import ConnectionError, HTTPError
+from luckydonaldUtils.logger import logging
+
+from .ratelimit import get_retry_after
+
+__author__ = 'luckydonald'
+__all__ = ['is_recoverable', 'retry_send']
+logger = logging.getLogger(__name__)
+
+
+def is_recoverable(exception):
+    """
+    If sending again could succeed, as the error was only temporary.
+    That's telegram (or a proxy in between) being overloaded (`429 Too Many Requests` or `5xx`),
+    or not being able to connect at all.
+
+    Other errors are not, e.g. a `400 Bad Request` will fail the same way again,
+    and after a read timeout telegram might have gotten the message already, so it would arrive twice.
+
+    :param exception: The exception raised by the bot api call.
+    :type  exception: Exception
+
+    :rtype: bool
+    """
+    if isinstance(exception, ConnectionError):  # includes ConnectTimeout, but not ReadTimeout.
+        return True
+    # end if
+    if isinstance(exception, HTTPError):  # a response which wasn't json at all, see PooledBot._post(...)
+        error_code = getattr(exception.response, 'status_code', None)
+    else:
+        error_code = getattr(exception, 'error_code', None)
+    # end if
+    return error_code is not None and (error_code == 429 or error_code >= 500)
+# end def
+
+
+def retry_send(fn, max_retries=3, base=1.0, cap=30.0, guard=None):
+    """
+    Calls `fn`, and calls it again if that failed with an recoverable error (see :func:`is_recoverable`).
+    Between the attempts it waits with an exponential backoff with jitter,
+    or the `retry_after` telegram told us for rate limit errors.
+
+    :param fn: The function doing the request, called without arguments.
+    :type  fn: callable
+
+    :param max_retries: How often to try again after the first attempt failed.
+    :type  max_retries: int
+
+    :param base: The seconds to wait before the first retry, doubled for every further one.
+    :type  base: float
+
+    :param cap: The maximum seconds to wait before a retry.
+                If telegram asks us to wait longer (`retry_after`), the error is raised instead of waiting that long.
+    :type  cap: float
+
+    :param guard: The circuit breaker to record the outcomes in. While it is open, no retries are done.
+    :type  guard: None | teleflask.server.breaker.RetryGuard
+
+    :return: Whatever `fn` returned.
+    """
+    attempt = 0
+    while True:
+        try:
+            result = fn()
+        except Exception as e:
+            recoverable = is_recoverable(e)
+            if guard is not None:
+                guard.record(rejected=recoverable)
+            # end if
+            if attempt >= max_retries or not recoverable or (guard is not None and not guard.allow()):
+                raise
+            # end if
+            retry_after = get_retry_after(e)
+            if retry_after is not None and retry_after > cap:
+                logger.debug('Not retrying, telegram asked us to wait %d seconds: %s', retry_after, e)
+                raise
+            # end if
+            delay = retry_after or min(cap, base * 2 ** attempt * (1 + random.uniform(0, 0.5)))
+            logger.debug('Request failed (attempt %d of %d), retrying in %.2f seconds: %s', attempt + 1, max_retries + 1, delay, e)
+            time.sleep(delay)
+            attempt += 1
+            continue
+        # end try
+        if guard is not None:
+            guard.record(rejected=False)
+        # end if
+        return result
+    # end while
+# end def
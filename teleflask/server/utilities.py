@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import logging
+from functools import wraps
 
 from ..exceptions import AbortProcessingPlease
 
@@ -38,12 +39,20 @@ def _class_self_decorate(decorator_name):
     :param decorator:
     :return:
     """
-    from functools import wraps
-
     def func_extractor(func):
+        # The decorator is applied only once per instance, on first call, instead of wrapping the function on every call.
+        # The result is stored on the instance itself. The id makes sure an overwritten method of a subclass,
+        # decorated the same way, doesn't share the name with the method of the parent class.
+        cache_attribute = "_{decorator}_{name}_{id}".format(decorator=decorator_name, name=func.__name__, id=id(func))
+
         @wraps(func)
-        def self_extractor(self, *args):
-            return getattr(self, decorator_name)(func)(self, *args)
+        def self_extractor(self, *args, **kwargs):
+            decorated = getattr(self, cache_attribute, None)
+            if decorated is None:
+                decorated = getattr(self, decorator_name)(func)
+                setattr(self, cache_attribute, decorated)
+            # end if
+            return decorated(self, *args, **kwargs)
         # end def
         return self_extractor
     # end def
@@ -51,6 +60,101 @@ def _class_self_decorate(decorator_name):
 # end def
 
 
+class RedactApiKeyFilter(logging.Filter):
+    """
+    Logging filter replacing the api keys with "<API_KEY>" in the log messages,
+    and in the tracebacks of logged exceptions (e.g. the url of a failed request in a `requests.ConnectionError`).
+
+    As filters only run for records which are actually logged,
+    the message is only searched for the keys if it passed the level check.
+    """
+    def __init__(self, api_keys=()):
+        """
+        :param api_keys: The keys to hide. More can be added later with :meth:`add`.
+        :type  api_keys: typing.Iterable[str]
+        """
+        super().__init__()
+        self.api_keys = frozenset(api_keys)  # replaced instead of modified, so filter() doesn't need a lock.
+    # end def
+
+    def add(self, api_key):
+        """
+        Hides the given key as well.
+
+        :param api_key: The key to hide.
+        :type  api_key: str
+        """
+        if api_key and api_key not in self.api_keys:
+            self.api_keys = self.api_keys | {api_key}
+        # end if
+    # end def
+
+    def filter(self, record):
+        api_keys = self.api_keys
+        if not api_keys:
+            return True
+        # end if
+        message = record.getMessage()  # the formatted message, as the key is usually in the arguments.
+        redacted = self._redact(message, api_keys)
+        if redacted is not message:
+            record.msg = redacted
+            record.args = None
+        # end if
+        if record.exc_info or record.exc_text:
+            # format the traceback now, so the handlers use the redacted text instead of formatting the exception again.
+            exc_text = record.exc_text or _exception_formatter.formatException(record.exc_info)
+            redacted = self._redact(exc_text, api_keys)
+            if redacted is not exc_text:
+                record.exc_text = redacted
+                record.exc_info = None
+            # end if
+        # end if
+        return True
+    # end def
+
+    @staticmethod
+    def _redact(text, api_keys):
+        """
+        Replaces the `api_keys` in `text`. Returns the very same `text` object, if none of them is in there.
+
+        :rtype: str
+        """
+        for api_key in api_keys:
+            if api_key in text:
+                text = text.replace(api_key, "<API_KEY>")
+            # end if
+        # end for
+        return text
+    # end def
+# end class
+
+
+_exception_formatter = logging.Formatter()  # formats tracebacks like the handlers would, see RedactApiKeyFilter.filter(...)
+
+
+_api_key_filter = RedactApiKeyFilter()  # shared by all the teleflask loggers, see redact_api_key_in_logs(...)
+
+
+def redact_api_key_in_logs(api_key):
+    """
+    Hides the api key in anything logged by the `teleflask` logger and the ones of its modules (`teleflask.*`).
+
+    A logger's filter doesn't apply to the records of its child loggers, so the one shared filter is added to each of them.
+    Calling this again (e.g. for another bot) only adds the key, no logger gets the filter twice.
+
+    :param api_key: The key to hide.
+    :type  api_key: str
+    """
+    _api_key_filter.add(api_key)
+    logging.getLogger("teleflask").addFilter(_api_key_filter)  # addFilter(...) is a no-op if already added.
+    for name, module_logger in list(logging.Logger.manager.loggerDict.items()):
+        if name.startswith("teleflask.") and isinstance(module_logger, logging.Logger):  # skip `PlaceHolder`s
+            module_logger.addFilter(_api_key_filter)
+        # end if
+    # end for
+# end def
+
+
 def abort_processing(func):
     """
     Wraps a function to automatically raise a `AbortProcessingPlease` exception after execution,
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+import threading
+import unittest
+from unittest import mock
+
+from flask import Flask, Response, current_app
+from pytgbot.api_types.receivable.peer import User
+from luckydonaldUtils.logger import logging
+
+from teleflask import Teleflask
+from teleflask.server import base
+
+__author__ = 'luckydonald'
+logger = logging.getLogger(__name__)
+
+API_KEY = "4458:FAKE_API_KEY_FOR_TESTING"
+
+
+class FakeBot(object):
+    """
+    Replaces :class:`teleflask.server.base.Bot`, answering like telegram would, but without any requests.
+    Expects `return_python_objects=False`.
+    """
+    def __init__(self, api_key, return_python_objects=True):
+        self.api_key = api_key
+        self.return_python_objects = return_python_objects
+        self.webhook_url = ""
+        self.calls = []
+    # end def
+
+    def get_me(self):
+        self.calls.append("get_me")
+        return {"ok": True, "result": {"id": 4458, "is_bot": True, "first_name": "Test Bot", "username": "TestBot"}}
+    # end def
+
+    def get_webhook_info(self):
+        self.calls.append("get_webhook_info")
+        return {"ok": True, "result": {"url": self.webhook_url, "has_custom_certificate": False, "pending_update_count": 0}}
+    # end def
+
+    def set_webhook(self, url):
+        self.calls.append("set_webhook")
+        self.webhook_url = url
+        return {"ok": True, "result": True}
+    # end def
+# end class
+
+
+class TeleflaskTestCase(unittest.TestCase):
+    """
+    Base for the test cases below, creating teleflask instances with a :class:`FakeBot`.
+    """
+    def setUp(self):
+        for patcher in (mock.patch.object(base, "Bot", FakeBot), mock.patch.object(base, "WEBHOOK_STATE_PATH", None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # end for
+        self.app = Flask(__name__)
+    # end def
+
+    def make_teleflask(self, **kwargs):
+        kwargs.setdefault("hostname", "example.com")
+        return Teleflask(API_KEY, return_python_objects=False, **kwargs)
+    # end def
+
+    def rules(self, endpoint):
+        return [rule.rule for rule in self.app.url_map.iter_rules() if rule.endpoint == endpoint]
+    # end def
+# end class
+
+
+class PendingRoutesTestCase(TeleflaskTestCase):
+    def test_setup_routes_before_init_app(self):
+        teleflask = self.make_teleflask()
+        teleflask.setup_routes("/income/{API_KEY}", debug_routes=True)
+        self.assertEqual(self.rules("webhook"), [], "no app yet => no routes yet")
+
+        teleflask.init_app(self.app)
+        self.assertEqual(self.rules("webhook"), ["/income/" + API_KEY], "placeholder filled in, webhook only added once")
+        self.assertEqual(self.rules("teleflask_debug_status"), ["/teleflask_debug/status"], "debug routes added once")
+    # end def
+
+    def test_setup_routes_before_init_app_other_hookpath(self):
+        teleflask = self.make_teleflask()
+        teleflask.setup_routes("/other/{API_KEY}")
+        teleflask.init_app(self.app)
+        self.assertEqual(
+            sorted(self.rules("webhook")), ["/income/" + API_KEY, "/other/" + API_KEY], "both hookpaths with the key"
+        )
+        self.assertEqual(self.rules("teleflask_debug_status"), [], "no debug routes requested")
+    # end def
+# end class
+
+
+class FailingGetMeBot(FakeBot):
+    def get_me(self):
+        raise ValueError("Unauthorized")  # what a wrong api key would get.
+    # end def
+# end class
+
+
+class SlowGetMeBot(FakeBot):
+    answer = threading.Event()
+
+    def get_me(self):
+        self.answer.wait()
+        return super().get_me()
+    # end def
+# end class
+
+
+class GetMeTestCase(TeleflaskTestCase):
+    def test_get_me(self):
+        teleflask = self.make_teleflask()
+        self.assertEqual(teleflask.username, "TestBot")
+        self.assertEqual(teleflask.user_id, 4458)
+    # end def
+
+    def test_get_me_failing(self):
+        with mock.patch.object(base, "Bot", FailingGetMeBot):
+            teleflask = self.make_teleflask()
+            with self.assertRaises(ValueError, msg="error of get_me re-raised"):
+                teleflask.username
+            # end with
+        # end with
+        teleflask.bot.get_me = FakeBot.get_me.__get__(teleflask.bot)  # telegram is reachable again.
+        self.assertEqual(teleflask.username, "TestBot", "asked telegram again")
+        self.assertEqual(teleflask.bot.calls, ["get_me"])
+        self.assertEqual(teleflask.user_id, 4458)
+        self.assertEqual(teleflask.bot.calls, ["get_me"], "not asked again once known")
+    # end def
+
+    def test_init_app_not_waiting(self):
+        self.addCleanup(SlowGetMeBot.answer.set)  # let the thread finish.
+        with mock.patch.object(base, "Bot", SlowGetMeBot), mock.patch.object(Teleflask, "GET_ME_TIMEOUT", 0.01):
+            teleflask = self.make_teleflask()
+            teleflask.init_app(self.app)  # would raise a TimeoutError if it waited.
+        # end with
+        self.assertEqual(self.rules("webhook"), ["/income/" + API_KEY])
+    # end def
+
+    def test_get_me_timeout(self):
+        self.addCleanup(SlowGetMeBot.answer.set)  # let the thread finish.
+        with mock.patch.object(base, "Bot", SlowGetMeBot), mock.patch.object(Teleflask, "GET_ME_TIMEOUT", 0.01):
+            teleflask = self.make_teleflask()
+            with self.assertRaises(TimeoutError):
+                teleflask.user_id
+            # end with
+        # end with
+    # end def
+# end class
+
+
+class IterMessagesTestCase(unittest.TestCase):
+    def test_single(self):
+        self.assertEqual(list(base._iter_messages("text")), ["text"], "a str is a single message, not its characters")
+    # end def
+
+    def test_multiple(self):
+        self.assertEqual(list(base._iter_messages(["a", "b"])), ["a", "b"])
+        self.assertEqual(list(base._iter_messages(("a", "b"))), ["a", "b"])
+        self.assertEqual(list(base._iter_messages(msg for msg in ("a", "b"))), ["a", "b"])
+    # end def
+
+    def test_refused(self):
+        for messages in ({"a": "b"}, {"a", "b"}, iter(["a"]), 4458, None):
+            with self.subTest(messages=messages), self.assertRaises(TypeError):
+                base._iter_messages(messages)
+            # end with
+        # end for
+    # end def
+# end class
+
+
+class RedactApiKeyTestCase(TeleflaskTestCase):
+    def test_other_module(self):
+        self.make_teleflask()  # only init_bot(), no app.
+        with self.assertLogs("teleflask.server.mixins", level="INFO") as logs:
+            logging.getLogger("teleflask.server.mixins").info("Calling https://api.telegram.org/bot%s/getMe", API_KEY)
+        # end with
+        self.assertEqual(logs.output, ["INFO:teleflask.server.mixins:Calling https://api.telegram.org/bot<API_KEY>/getMe"])
+    # end def
+
+    def test_exception(self):
+        self.make_teleflask()
+        with self.assertLogs("teleflask.server.base", level="ERROR") as logs:
+            try:
+                raise ConnectionError("Max retries exceeded with url: /bot%s/sendMessage" % API_KEY)
+            except ConnectionError:
+                logging.getLogger("teleflask.server.base").exception("Sending failed.")
+            # end try
+        # end with
+        self.assertIn("/bot<API_KEY>/sendMessage", logs.output[0], "traceback still logged")
+        self.assertNotIn(API_KEY, logs.output[0])
+    # end def
+
+    def test_webhook(self):
+        teleflask = self.make_teleflask()
+        with self.assertLogs("teleflask.server.base", level="INFO") as logs:
+            teleflask.init_app(self.app)
+        # end with
+        self.assertIn("INFO:teleflask.server.base:Setting webhook to https://example.com/income/<API_KEY>", logs.output)
+        self.assertNotIn(API_KEY, "\n".join(logs.output))
+        self.assertIn(API_KEY, teleflask.bot.webhook_url, "only hidden in the logs")
+    # end def
+# end class
+
+
+class ViewUpdatesTestCase(TeleflaskTestCase):
+    def post_update(self, result):
+        teleflask = self.make_teleflask()
+        with mock.patch.object(teleflask, "process_update", return_value=result):
+            teleflask.init_app(self.app)
+            return self.app.test_client().post("/income/" + API_KEY, json={"update_id": 4458})
+        # end with
+    # end def
+
+    def test_dict(self):
+        response = self.post_update({"method": "sendMessage", "chat_id": 1, "text": "hey"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {"method": "sendMessage", "chat_id": 1, "text": "hey"})
+    # end def
+
+    def test_tuple(self):
+        response = self.post_update(({"status": "later"}, 202))
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.get_json(), {"status": "later"})
+    # end def
+
+    def test_response(self):
+        response = self.post_update(Response("plain", status=201, mimetype="text/plain"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_data(as_text=True), "plain")
+    # end def
+
+    def test_api_object(self):
+        response = self.post_update(User(id=4458, is_bot=True, first_name="Test Bot"))
+        self.assertEqual(response.get_json(), {"id": 4458, "is_bot": True, "first_name": "Test Bot"})
+    # end def
+# end class
+
+
+class BackgroundProcessingTestCase(TeleflaskTestCase):
+    def test_queued_update_processed(self):
+        processed = []
+
+        def process_update(update):
+            processed.append((update.update_id, current_app.name))
+        # end def
+
+        teleflask = self.make_teleflask(process_in_background=True)
+        with mock.patch.object(teleflask, "process_update", side_effect=process_update):
+            teleflask.init_app(self.app)
+            response = self.app.test_client().post("/income/" + API_KEY, json={"update_id": 4458})
+            self.assertEqual(response.get_json(), {"status": "queued"}, "answered before processing")
+            self.assertTrue(teleflask.stop_background_processing(timeout=5), "thread ended")
+        # end with
+        self.assertEqual(processed, [(4458, self.app.name)], "processed in the app context")
+    # end def
+
+    def test_not_started_without_app(self):
+        teleflask = self.make_teleflask(process_in_background=True)
+        self.assertTrue(teleflask.stop_background_processing(timeout=5), "nothing to stop")
+    # end def
+# end class
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import unittest
+from unittest import mock
+
+from luckydonaldUtils.logger import logging
+
+from teleflask.server import breaker
+from teleflask.server.breaker import RetryGuard, get_retry_guard
+
+__author__ = 'luckydonald'
+logger = logging.getLogger(__name__)
+
+
+class RetryGuardTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(breaker.time, "monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.guard = RetryGuard(window=30, threshold=0.2, open_after=5, probe_after=10)
+    # end def
+
+    def fail_for(self, seconds):
+        """
+        Records a rejected request every second, for the given seconds.
+        """
+        for _ in range(seconds):
+            self.guard.record(rejected=True)
+            self.now += 1
+        # end for
+    # end def
+
+    def open(self):
+        self.fail_for(7)
+        self.assertTrue(self.guard.is_open, "failing for longer than open_after")
+    # end def
+
+    def test_closed(self):
+        self.assertFalse(self.guard.is_open)
+        self.assertTrue(self.guard.allow())
+    # end def
+
+    def test_below_threshold(self):
+        for i in range(100):
+            self.guard.record(rejected=i % 10 == 0)  # 10% rejected
+            self.now += 0.1
+        # end for
+        self.assertFalse(self.guard.is_open)
+        self.assertTrue(self.guard.allow())
+    # end def
+
+    def test_not_open_before_open_after(self):
+        self.fail_for(5)
+        self.assertFalse(self.guard.is_open, "over the threshold, but only for 4 seconds")
+        self.assertTrue(self.guard.allow())
+    # end def
+
+    def test_recovering_before_open_after(self):
+        self.fail_for(3)
+        for _ in range(20):
+            self.guard.record(rejected=False)
+        # end for
+        self.fail_for(3)
+        self.assertFalse(self.guard.is_open, "the time over the threshold starts again")
+    # end def
+
+    def test_open(self):
+        self.open()
+        self.assertFalse(self.guard.allow(), "no retries while open")
+    # end def
+
+    def test_probe_success(self):
+        self.open()
+        self.now += 10
+        self.assertTrue(self.guard.allow(), "a single probe after probe_after")
+        self.assertFalse(self.guard.allow(), "only a single one")
+        self.guard.record(rejected=False)
+        self.assertFalse(self.guard.is_open, "closed by the successful probe")
+        self.assertTrue(self.guard.allow())
+        self.guard.record(rejected=True)
+        self.assertFalse(self.guard.is_open, "old rejections are forgotten")
+    # end def
+
+    def test_probe_failure(self):
+        self.open()
+        self.now += 10
+        self.assertTrue(self.guard.allow(), "probe")
+        self.guard.record(rejected=True)
+        self.assertTrue(self.guard.is_open, "still failing")
+        self.assertFalse(self.guard.allow(), "next probe only after another probe_after")
+        self.now += 10
+        self.assertTrue(self.guard.allow(), "next probe")
+    # end def
+
+    def test_window(self):
+        self.fail_for(3)
+        self.now += 31
+        self.guard.record(rejected=False)
+        self.fail_for(3)
+        self.assertFalse(self.guard.is_open, "the rejections older than the window don't count")
+    # end def
+# end class
+
+
+class GetRetryGuardTestCase(unittest.TestCase):
+    def test_shared_per_key(self):
+        guard = get_retry_guard("4458:FAKE_API_KEY_FOR_TESTING")
+        self.assertIsInstance(guard, RetryGuard)
+        self.assertIs(get_retry_guard("4458:FAKE_API_KEY_FOR_TESTING"), guard)
+        self.assertIsNot(get_retry_guard("4459:OTHER_FAKE_API_KEY"), guard)
+    # end def
+# end class
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import unittest
+from unittest import mock
+
+from luckydonaldUtils.logger import logging
+
+from teleflask import Teleflask
+from teleflask.server import base
+from teleflask.server.pooling import PooledBot
+
+__author__ = 'luckydonald'
+logger = logging.getLogger(__name__)
+
+API_KEY = "4458:FAKE_API_KEY_FOR_TESTING"
+GET_ME_RESPONSE = {"ok": True, "result": {"id": 4458, "is_bot": True, "first_name": "Test Bot", "username": "TestBot"}}
+
+
+def make_session(json):
+    """
+    A mocked :class:`requests.Session`, answering every `post(...)` with the given json.
+    """
+    session = mock.Mock()
+    response = session.post.return_value
+    response.status_code = 200
+    response.json.return_value = json
+    return session
+# end def
+
+
+class PooledBotTestCase(unittest.TestCase):
+    def test_requests_use_session(self):
+        session = make_session(GET_ME_RESPONSE)
+        bot = PooledBot(API_KEY, return_python_objects=False, session=session)
+        result = bot.get_me()
+        session.post.assert_called_once()
+        url = session.post.call_args[0][0]
+        self.assertIn(API_KEY, url)
+        self.assertTrue(url.endswith("/getMe"), "called the getMe method")
+        self.assertEqual(result["result"]["username"], "TestBot")
+    # end def
+
+    def test_files_sent(self):
+        session = make_session({"ok": True, "result": True})
+        bot = PooledBot(API_KEY, return_python_objects=False, session=session)
+        photo = ("photo.png", b"not really a png")
+        bot.do("sendPhoto", files={"photo": photo}, chat_id=1)
+        kwargs = session.post.call_args[1]
+        self.assertEqual(kwargs["files"], {"photo": photo})
+        self.assertEqual(kwargs["params"], {"chat_id": 1})
+    # end def
+
+    def test_creates_session(self):
+        bot = PooledBot(API_KEY, return_python_objects=False)
+        self.assertIsNotNone(bot.session)
+    # end def
+
+    def test_teleflask_uses_session(self):
+        session = make_session(GET_ME_RESPONSE)
+        with mock.patch.object(base, "create_session", return_value=session) as create_session, \
+                mock.patch.object(base, "Bot", PooledBot):  # other tests replace it for good.
+            teleflask = Teleflask(API_KEY, return_python_objects=False, connection_pool_size=3)
+            self.assertEqual(teleflask.username, "TestBot")
+        # end with
+        create_session.assert_called_once_with(pool_size=3)
+        self.assertIsInstance(teleflask.bot, PooledBot)
+        self.assertIs(teleflask.bot.session, session)
+        session.post.assert_called_once()
+    # end def
+
+    def test_replaced_bot_class(self):
+        class FakeBot(object):
+            def __init__(self, api_key, return_python_objects=True):
+                self.return_python_objects = return_python_objects
+            # end def
+
+            def get_me(self):
+                return GET_ME_RESPONSE
+            # end def
+        # end class
+
+        with mock.patch.object(base, "Bot", FakeBot):
+            teleflask = Teleflask(API_KEY, return_python_objects=False)
+        # end with
+        self.assertIsInstance(teleflask.bot, FakeBot)
+        self.assertEqual(teleflask.username, "TestBot")
+    # end def
+# end class
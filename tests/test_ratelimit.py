@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+import unittest
+from unittest import mock
+
+from luckydonaldUtils.logger import logging
+
+from teleflask.server import ratelimit
+from teleflask.server.ratelimit import RateLimiter, get_retry_after, get_result_retry_after
+
+__author__ = 'luckydonald'
+logger = logging.getLogger(__name__)
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.sleeps = []
+        # only the `time` module as seen by the rate limiter, not the global one used by everything else.
+        patcher = mock.patch.object(ratelimit, "time")
+        fake_time = patcher.start()
+        self.addCleanup(patcher.stop)
+        fake_time.monotonic.side_effect = lambda: self.now
+        fake_time.sleep.side_effect = self.sleep
+    # end def
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+    # end def
+
+    def test_burst(self):
+        limiter = RateLimiter(rate=4, per=1.0)
+        for _ in range(4):
+            limiter.acquire()
+        # end for
+        self.assertEqual(self.sleeps, [], "a burst of `rate` calls doesn't wait")
+    # end def
+
+    def test_waits_when_empty(self):
+        limiter = RateLimiter(rate=4, per=1.0)
+        for _ in range(5):
+            limiter.acquire()
+        # end for
+        self.assertEqual(len(self.sleeps), 1)
+        self.assertEqual(self.sleeps[0], 0.25, msg="until the next token is refilled")
+    # end def
+
+    def test_refill(self):
+        limiter = RateLimiter(rate=4, per=1.0)
+        for _ in range(4):
+            limiter.acquire()
+        # end for
+        self.now += 0.5  # refills two tokens
+        limiter.acquire()
+        limiter.acquire()
+        self.assertEqual(self.sleeps, [], "refilled over time")
+        limiter.acquire()
+        self.assertEqual(len(self.sleeps), 1, "but not more")
+    # end def
+
+    def test_refill_capped(self):
+        limiter = RateLimiter(rate=4, per=1.0)
+        self.now += 60  # idle for a long time
+        for _ in range(5):
+            limiter.acquire()
+        # end for
+        self.assertEqual(len(self.sleeps), 1, "the burst is still only `rate` calls")
+    # end def
+
+    def test_almost_full_token(self):
+        limiter = RateLimiter(rate=5, per=1.0)
+        for _ in range(5):
+            limiter.acquire()
+        # end for
+        self.now += 0.2 - 1e-12  # float rounding leaves the token a hair below 1.
+        limiter.acquire()
+        self.assertEqual(self.sleeps, [], "counted as a full token")
+    # end def
+
+    def test_minimum_wait(self):
+        limiter = RateLimiter(rate=5, per=1.0)
+        for _ in range(5):
+            limiter.acquire()
+        # end for
+        self.now += 0.2 - 1e-6  # missing a tiny bit of a token.
+        limiter.acquire()
+        self.assertEqual(self.sleeps, [ratelimit._MIN_WAIT], "doesn't sleep for a timespan too short to matter")
+    # end def
+
+    def test_pause(self):
+        limiter = RateLimiter(rate=4, per=1.0)
+        limiter.pause(3)
+        limiter.acquire()
+        self.assertEqual(self.sleeps, [3])
+        limiter.pause(2)
+        limiter.pause(1)  # doesn't shorten the longer pause
+        limiter.acquire()
+        self.assertEqual(self.sleeps, [3, 2])
+    # end def
+# end class
+
+
+class GetRetryAfterTestCase(unittest.TestCase):
+    @staticmethod
+    def make_error(error_code, json):
+        error = Exception(error_code)
+        error.error_code = error_code
+        error.response = mock.Mock()
+        error.response.json.return_value = json
+        return error
+    # end def
+
+    def test_retry_after(self):
+        error = self.make_error(429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 7}})
+        self.assertEqual(get_retry_after(error), 7)
+    # end def
+
+    def test_other_errors(self):
+        error = self.make_error(400, {"ok": False, "error_code": 400, "parameters": {"retry_after": 7}})
+        self.assertIsNone(get_retry_after(error), "not a rate limit error")
+        self.assertIsNone(get_retry_after(ValueError()), "no api error at all")
+    # end def
+
+    def test_missing(self):
+        error = self.make_error(429, {"ok": False, "error_code": 429, "description": "Too Many Requests"})
+        self.assertIsNone(get_retry_after(error))
+    # end def
+# end class
+
+
+class GetResultRetryAfterTestCase(unittest.TestCase):
+    def test_retry_after(self):
+        result = {"ok": False, "error_code": 429, "parameters": {"retry_after": 7}}
+        self.assertEqual(get_result_retry_after(result), 7)
+    # end def
+
+    def test_other_results(self):
+        self.assertIsNone(get_result_retry_after({"ok": True, "result": True}), "no error")
+        self.assertIsNone(get_result_retry_after({"ok": False, "error_code": 400}), "not a rate limit error")
+        self.assertIsNone(get_result_retry_after({"ok": False, "error_code": 429}), "no parameters")
+        self.assertIsNone(get_result_retry_after(True), "return_python_objects=True answer")
+    # end def
+# end class
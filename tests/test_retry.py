@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+import unittest
+from unittest import mock
+
+from requests.exceptions import ConnectionError, ReadTimeout, HTTPError
+from luckydonaldUtils.logger import logging
+
+from teleflask import Teleflask
+from teleflask.server import retry
+from teleflask.server.breaker import RetryGuard
+from teleflask.server.pooling import PooledBot
+from teleflask.server.ratelimit import RateLimiter
+from teleflask.server.retry import is_recoverable, retry_send
+
+__author__ = 'luckydonald'
+logger = logging.getLogger(__name__)
+
+API_KEY = "4458:FAKE_API_KEY_FOR_TESTING"
+GET_ME_RESPONSE = {"ok": True, "result": {"id": 4458, "is_bot": True, "first_name": "Test Bot", "username": "TestBot"}}
+SENT_RESPONSE = {"ok": True, "result": True}
+RATE_LIMITED_RESPONSE = {
+    "ok": False, "error_code": 429, "description": "Too Many Requests: retry after 3", "parameters": {"retry_after": 3},
+}
+BAD_GATEWAY_RESPONSE = {"ok": False, "error_code": 502, "description": "Bad Gateway"}
+
+
+class ApiError(Exception):
+    """
+    Like pytgbot's `TgApiServerException`, having the `error_code` and the `response` of the failed call.
+    """
+    def __init__(self, error_code, retry_after=None):
+        super().__init__(error_code)
+        self.error_code = error_code
+        self.response = mock.Mock()
+        self.response.json.return_value = {"ok": False, "error_code": error_code, "parameters": {"retry_after": retry_after}}
+    # end def
+# end class
+
+
+def http_error(status_code):
+    response = mock.Mock(status_code=status_code)
+    return HTTPError(response=response)
+# end def
+
+
+class IsRecoverableTestCase(unittest.TestCase):
+    def test_recoverable(self):
+        self.assertTrue(is_recoverable(ApiError(429)), "rate limited")
+        self.assertTrue(is_recoverable(ApiError(500)), "internal server error")
+        self.assertTrue(is_recoverable(ApiError(502)), "bad gateway")
+        self.assertTrue(is_recoverable(http_error(503)), "no json, but a 5xx page")
+        self.assertTrue(is_recoverable(ConnectionError()), "not connected at all")
+    # end def
+
+    def test_not_recoverable(self):
+        self.assertFalse(is_recoverable(ApiError(400)), "bad request fails again")
+        self.assertFalse(is_recoverable(ApiError(403)), "blocked by the user")
+        self.assertFalse(is_recoverable(http_error(404)), "no json, but not a server error")
+        self.assertFalse(is_recoverable(ReadTimeout()), "telegram could have gotten it already")
+        self.assertFalse(is_recoverable(ValueError()), "no idea what happened")
+    # end def
+# end class
+
+
+class RetrySendTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(retry.time, "sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+    # end def
+
+    def test_success(self):
+        fn = mock.Mock(return_value="result")
+        self.assertEqual(retry_send(fn, max_retries=3), "result")
+        fn.assert_called_once_with()
+        self.sleep.assert_not_called()
+    # end def
+
+    def test_retries_recoverable(self):
+        fn = mock.Mock(side_effect=[ApiError(502), ConnectionError(), "result"])
+        self.assertEqual(retry_send(fn, max_retries=3), "result")
+        self.assertEqual(fn.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+    # end def
+
+    def test_gives_up(self):
+        fn = mock.Mock(side_effect=ApiError(502))
+        with self.assertRaises(ApiError):
+            retry_send(fn, max_retries=2)
+        # end with
+        self.assertEqual(fn.call_count, 3, "first attempt and two retries")
+    # end def
+
+    def test_not_retrying_unrecoverable(self):
+        fn = mock.Mock(side_effect=ApiError(400))
+        with self.assertRaises(ApiError):
+            retry_send(fn, max_retries=3)
+        # end with
+        fn.assert_called_once_with()
+        self.sleep.assert_not_called()
+    # end def
+
+    def test_backoff_capped(self):
+        fn = mock.Mock(side_effect=[ApiError(502)] * 6 + ["result"])
+        retry_send(fn, max_retries=6, base=1.0, cap=5.0)
+        delays = [call[0][0] for call in self.sleep.call_args_list]
+        self.assertEqual(len(delays), 6)
+        self.assertGreaterEqual(delays[0], 1.0)
+        self.assertLessEqual(delays[0], 1.5, "base plus at most 50% jitter")
+        self.assertLessEqual(max(delays), 5.0, "never more than cap")
+        self.assertEqual(delays[-1], 5.0, "1 * 2**5 is capped")
+    # end def
+
+    def test_retry_after(self):
+        fn = mock.Mock(side_effect=[ApiError(429, retry_after=3), "result"])
+        self.assertEqual(retry_send(fn, max_retries=3, cap=5.0), "result")
+        self.sleep.assert_called_once_with(3)
+    # end def
+
+    def test_retry_after_above_cap(self):
+        fn = mock.Mock(side_effect=ApiError(429, retry_after=60))
+        with self.assertRaises(ApiError):
+            retry_send(fn, max_retries=3, cap=5.0)
+        # end with
+        fn.assert_called_once_with()
+        self.sleep.assert_not_called()
+    # end def
+
+    def test_guard_open(self):
+        guard = mock.Mock(spec=RetryGuard)
+        guard.allow.return_value = False
+        fn = mock.Mock(side_effect=ApiError(502))
+        with self.assertRaises(ApiError):
+            retry_send(fn, max_retries=3, guard=guard)
+        # end with
+        fn.assert_called_once_with()
+        guard.record.assert_called_once_with(rejected=True)
+    # end def
+# end class
+
+
+class CompositeMessage(object):
+    """
+    A message needing two api calls, like a message with a reply keyboard removed afterwards.
+    """
+    def send(self, bot):
+        bot.do("sendMessage", chat_id=1, text="top")
+        return bot.do("sendChatAction", chat_id=1, action="typing")
+    # end def
+# end class
+
+
+class BotRetryTestCase(unittest.TestCase):
+    """
+    The retries are done by the bot for the single failed request, not for the whole message.
+    """
+    def setUp(self):
+        patcher = mock.patch.object(retry.time, "sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.commands = []  # every request sent, by the api method called.
+        self.failures = {}  # how the next requests of an api method fail, by the api method. See post(...)
+        self.session = mock.Mock()
+        self.session.post.side_effect = self.post
+    # end def
+
+    def post(self, url, **kwargs):
+        command = url.rsplit("/", 1)[-1]
+        if command == "getMe":
+            return self.make_response(200, GET_ME_RESPONSE)
+        # end if
+        self.commands.append(command)
+        if self.failures.get(command):
+            failure = self.failures[command].pop(0)
+            if isinstance(failure, dict):  # an error answer of telegram.
+                return self.make_response(failure["error_code"], failure)
+            # end if
+            return self.make_response(failure, None)  # only a status code.
+        # end if
+        return self.make_response(200, SENT_RESPONSE)
+    # end def
+
+    @staticmethod
+    def make_response(status_code, json):
+        response = mock.Mock(status_code=status_code)
+        if json is None:  # e.g. the html page of a proxy
+            response.json.side_effect = ValueError("No JSON object could be decoded")
+            response.raise_for_status.side_effect = HTTPError(response=response)
+        else:
+            response.json.return_value = json
+        # end if
+        return response
+    # end def
+
+    def make_teleflask(self, **kwargs):
+        with mock.patch("teleflask.server.base.create_session", return_value=self.session), \
+                mock.patch("teleflask.server.base.Bot", PooledBot):  # other tests replace it for good.
+            teleflask = Teleflask(API_KEY, return_python_objects=False, **kwargs)
+            teleflask.user_id  # wait for get_me
+        # end with
+        return teleflask
+    # end def
+
+    def test_retries_only_failed_call(self):
+        teleflask = self.make_teleflask(send_retries=2)
+        self.failures = {"sendChatAction": [502]}  # only the second api call of the message fails, once.
+        teleflask._send_message(CompositeMessage())
+        self.assertEqual(self.commands, ["sendMessage", "sendChatAction", "sendChatAction"])
+    # end def
+
+    def test_retries_error_answer(self):
+        teleflask = self.make_teleflask(send_retries=2)
+        self.failures = {"sendChatAction": [RATE_LIMITED_RESPONSE, BAD_GATEWAY_RESPONSE]}
+        result = teleflask._send_message(CompositeMessage())
+        self.assertEqual(result, SENT_RESPONSE, "returned like any other answer, but retried anyway")
+        self.assertEqual(self.commands, ["sendMessage", "sendChatAction", "sendChatAction", "sendChatAction"])
+    # end def
+
+    def test_error_answer_after_retries(self):
+        teleflask = self.make_teleflask(send_retries=1)
+        self.failures = {"sendMessage": [BAD_GATEWAY_RESPONSE, BAD_GATEWAY_RESPONSE]}
+        result = teleflask.bot.do("sendMessage", chat_id=1, text="top")
+        self.assertEqual(result, BAD_GATEWAY_RESPONSE, "returned as without retries")
+        self.assertEqual(self.commands, ["sendMessage", "sendMessage"])
+    # end def
+
+    def test_rate_limit_error_answer(self):
+        teleflask = self.make_teleflask(send_rate_limit=30)
+        self.failures = {"sendChatAction": [RATE_LIMITED_RESPONSE]}
+        with mock.patch.object(RateLimiter, "pause") as pause:
+            result = teleflask._send_message(CompositeMessage())
+        # end with
+        self.assertEqual(result, RATE_LIMITED_RESPONSE)
+        pause.assert_called_once_with(3)
+    # end def
+
+    def test_no_retries_by_default(self):
+        teleflask = self.make_teleflask()
+        self.failures = {"sendMessage": [502]}
+        with self.assertRaises(HTTPError):
+            teleflask._send_message(CompositeMessage())
+        # end with
+        self.assertEqual(self.commands, ["sendMessage"])
+    # end def
+
+    def test_no_retries_uploading_files(self):
+        teleflask = self.make_teleflask(send_retries=2)
+        self.failures = {"sendPhoto": [502]}
+        with self.assertRaises(HTTPError):
+            teleflask.bot.do("sendPhoto", files={"photo": ("photo.png", b"not really a png")}, chat_id=1)
+        # end with
+        self.assertEqual(self.commands, ["sendPhoto"], "the file is already read")
+    # end def
+# end class